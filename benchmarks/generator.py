@@ -0,0 +1,117 @@
+"""
+Synthetic report in layout of sheets 'Раздел 1', 'Раздел 2', 'Раздел 3' of input/example.xlsx.
+
+Run: python -m benchmarks.generator output.xlsx --employees 1000 --periods 12
+"""
+import argparse
+import os
+import random
+from typing import List
+
+from openpyxl import Workbook, load_workbook
+
+from src.handlers import SALARY_MIN_ROW, SALARY_FUND_MIN_ROW, EXECUTIVE_SALARY_MIN_ROW
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEMPLATE = os.path.join(BASE_DIR, 'input', 'example.xlsx')
+SHEETS = (
+    ('Раздел 1', SALARY_MIN_ROW),
+    ('Раздел 2', SALARY_FUND_MIN_ROW),
+    ('Раздел 3', EXECUTIVE_SALARY_MIN_ROW),
+)
+MONTHS = ('Январь', 'Февраль', 'Март', 'Апрель', 'Май', 'Июнь',
+          'Июль', 'Август', 'Сентябрь', 'Октябрь', 'Ноябрь', 'Декабрь')
+LAST_NAMES = ('Иванов', 'Петров', 'Сидоров', 'Кузнецов', 'Смирнов', 'Попов', 'Волков', 'Соколов')
+FIRST_NAMES = ('Иван', 'Петр', 'Сергей', 'Андрей', 'Алексей', 'Николай', 'Михаил', 'Дмитрий')
+MIDDLE_NAMES = ('Иванович', 'Петрович', 'Сергеевич', 'Андреевич', 'Алексеевич', 'Николаевич')
+POSITIONS = ('Водитель автомобиля', 'Бухгалтер', 'Врач', 'Медицинская сестра', 'Учитель', 'Повар')
+CATEGORY_CODES = (201, 221, 291, 211, 401, 501, 600)
+EMPLOYMENT_CONDITIONS = ('Основное', 'Внешнее совместительство', 'Внутреннее совместительство')
+INN = 1111111111
+KPP = 111111111
+
+
+def _header_rows(sheet_name: str, min_row: int) -> List[tuple]:
+    wb = load_workbook(filename=TEMPLATE, read_only=True)
+    rows = list(wb[sheet_name].iter_rows(max_row=min_row - 1, values_only=True))
+    wb.close()
+    return rows
+
+
+def _salary_row(random_generator: random.Random, year: int, month: int, employee: int, organization: int = 0) -> list:
+    accruals = [round(random_generator.uniform(0, 20000), 2) for _ in range(5)]
+    experience_years = random_generator.randint(0, 40)
+    name = (f'{LAST_NAMES[employee % len(LAST_NAMES)]} {FIRST_NAMES[employee // 8 % len(FIRST_NAMES)]} '
+            f'{MIDDLE_NAMES[employee // 64 % len(MIDDLE_NAMES)]}')
+    return [
+        year, MONTHS[month - 1], INN + organization, KPP + organization, 13, 12, name, 10000000000 + employee,
+        experience_years, POSITIONS[employee % len(POSITIONS)], CATEGORY_CODES[employee % len(CATEGORY_CODES)],
+        EMPLOYMENT_CONDITIONS[employee % len(EMPLOYMENT_CONDITIONS)], 1, 176, 168, accruals[0], 0, 0, 0,
+        accruals[1], 0, accruals[2], f'{experience_years} лет {employee % 12} мес', accruals[3], 0, 0, 0, 0, 0, 0, 0,
+        0, 0, accruals[4], round(sum(accruals), 2),
+    ]
+
+
+def generate_report(
+        filename: str,
+        employees: int = 100,
+        periods: int = 12,
+        rows_per_employee: int = 1,
+        year: int = 2020,
+        seed: int = 0,
+        organizations: int = 1,
+) -> int:
+    """
+    Write synthetic report, rows of first sheet sorted by period
+    :param employees: int - number of employees
+    :param periods: int - number of months from January, up to 12 in year, next in following years
+    :param rows_per_employee: int - rows (positions) of employee in each period
+    :param organizations: int - employees distributed between organizations with different inn and kpp
+    :return: int - number of rows in first sheet
+    """
+    random_generator = random.Random(seed)
+    wb = Workbook(write_only=True)
+    sheets = {name: wb.create_sheet(name) for name, _ in SHEETS}
+    for name, min_row in SHEETS:
+        for row in _header_rows(name, min_row):
+            sheets[name].append(row)
+    rows = 0
+    for period in range(periods):
+        period_year, month = year + period // 12, period % 12 + 1
+        for employee in range(employees):
+            for _ in range(rows_per_employee):
+                sheets['Раздел 1'].append(
+                    _salary_row(random_generator, period_year, month, employee, employee % organizations))
+                rows += 1
+    years = range(year, year + (periods - 1) // 12 + 1)
+    for organization in range(organizations):
+        inn, kpp = INN + organization, KPP + organization
+        for fund_year in years:
+            sheets['Раздел 2'].append([fund_year, inn, kpp, 1234, None, None, 14295954300, 2134108900, None, None,
+                                       3621222300, 5001, 2227204900, 19026101])
+            sheets['Раздел 3'].append([fund_year, inn, kpp, 3822484.57, 29622132.81, 302212403.85, 1266912343.62])
+    wb.save(filename)
+    return rows
+
+
+def parse_args(args=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Synthetic report for benchmarks')
+    parser.add_argument('filename')
+    parser.add_argument('--employees', type=int, default=100)
+    parser.add_argument('--periods', type=int, default=12)
+    parser.add_argument('--rows-per-employee', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--organizations', type=int, default=1)
+    return parser.parse_args(args)
+
+
+if __name__ == '__main__':
+    arguments = parse_args()
+    generate_report(
+        arguments.filename,
+        arguments.employees,
+        arguments.periods,
+        arguments.rows_per_employee,
+        seed=arguments.seed,
+        organizations=arguments.organizations,
+    )
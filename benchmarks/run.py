@@ -0,0 +1,134 @@
+"""
+Benchmark of conversion stages on synthetic reports of several sizes.
+Report throughput (rows/s) and peak memory of stages, fail on regression against stored baseline.
+
+Run: python -m benchmarks.run
+Reader engine of workbook from settings (READER).
+Update baseline: python -m benchmarks.run --update-baseline
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+from benchmarks.generator import generate_report
+from src.converter import open_workbook
+from src.handlers import (
+    create_group_by_period_salary_data,
+    create_xml_file,
+    load_executive_salaries,
+    load_salary,
+    load_salary_fund,
+)
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+# (employees, periods)
+SIZES = ((100, 12), (500, 12), (1000, 12))
+TOLERANCE = 0.3
+
+
+def _load_salary(report_file: str) -> list:
+    wb = open_workbook(report_file)
+    rows = list(load_salary(wb['Раздел 1']))
+    wb.close()
+    return rows
+
+
+def _stages(report_file: str, xml_file: str) -> List[Tuple[str, Callable]]:
+    """Stages of conversion, each stage get result of previous"""
+    wb = open_workbook(report_file)
+    salary_fund_data = list(load_salary_fund(wb['Раздел 2']))
+    executive_salary = list(load_executive_salaries(wb['Раздел 3']))
+    wb.close()
+    return [
+        ('load_salary', lambda _: _load_salary(report_file)),
+        ('create_group_by_period_salary_data', create_group_by_period_salary_data),
+        ('create_xml_file',
+         lambda periods: create_xml_file(xml_file, periods, salary_fund_data, executive_salary, 'guid')),
+    ]
+
+
+def measure(report_file: str, rows: int, xml_file: str) -> Dict[str, Dict[str, float]]:
+    """Throughput by time of run without tracing and peak memory by run with tracemalloc"""
+    result = {}
+    value = None
+    for name, stage in _stages(report_file, xml_file):
+        start = time.perf_counter()
+        value = stage(value)
+        result[name] = {'rows_per_second': rows / (time.perf_counter() - start)}
+    value = None
+    for name, stage in _stages(report_file, xml_file):
+        tracemalloc.start()
+        value = stage(value)
+        result[name]['peak_memory_mb'] = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        tracemalloc.stop()
+    return result
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Regressions: throughput less or peak memory more than baseline with tolerance"""
+    regressions = []
+    for size, stages in results.items():
+        for name, values in stages.items():
+            expected = baseline.get(size, {}).get(name)
+            if not expected:
+                continue
+            if values['rows_per_second'] < expected['rows_per_second'] * (1 - tolerance):
+                regressions.append(f'{size} {name}: {values["rows_per_second"]:.0f} rows/s, '
+                                   f'baseline {expected["rows_per_second"]:.0f} rows/s')
+            if values['peak_memory_mb'] > expected['peak_memory_mb'] * (1 + tolerance):
+                regressions.append(f'{size} {name}: {values["peak_memory_mb"]:.1f} Mb, '
+                                   f'baseline {expected["peak_memory_mb"]:.1f} Mb')
+    return regressions
+
+
+def run(sizes, work_dir: str) -> dict:
+    results = {}
+    for employees, periods in sizes:
+        report_file = os.path.join(work_dir, f'report_{employees}_{periods}.xlsx')
+        rows = generate_report(report_file, employees, periods)
+        size = f'{employees}x{periods}'
+        results[size] = measure(report_file, rows, os.path.join(work_dir, 'report.xml'))
+        for name, values in results[size].items():
+            sys.stdout.write(f'{size:<12}{rows:>8} rows  {name:<36}{values["rows_per_second"]:>12.0f} rows/s'
+                             f'{values["peak_memory_mb"]:>10.1f} Mb\n')
+    return results
+
+
+def _size(value: str) -> Tuple[int, int]:
+    employees, periods = value.split('x')
+    return int(employees), int(periods)
+
+
+def parse_args(args=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Benchmark of conversion stages')
+    parser.add_argument('--sizes', nargs='+', type=_size, default=SIZES, help='sizes as EMPLOYEESxPERIODS')
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE)
+    parser.add_argument('--update-baseline', action='store_true')
+    return parser.parse_args(args)
+
+
+def main(args=None) -> int:
+    arguments = parse_args(args)
+    with tempfile.TemporaryDirectory() as work_dir:
+        results = run(arguments.sizes, work_dir)
+    if arguments.update_baseline:
+        with open(arguments.baseline, mode='w', encoding='utf-8') as baseline_file:
+            json.dump(results, baseline_file, indent=4)
+        return 0
+    if not os.path.exists(arguments.baseline):
+        return 0
+    with open(arguments.baseline, encoding='utf-8') as baseline_file:
+        regressions = compare(results, json.load(baseline_file), arguments.tolerance)
+    for regression in regressions:
+        sys.stdout.write(f'Regression {regression}\n')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,26 @@
+"""
+Microbenchmark of per-row validation of Salary.
+
+Run: python -m benchmarks.validation
+"""
+import sys
+import timeit
+
+from benchmarks.serialization import ROW
+from src.models import Salary
+from src.records import validate_salary
+
+
+def main(number: int = 20000) -> None:
+    values = {**dict.fromkeys(Salary.__fields__), **ROW}
+    cases = (
+        ('pydantic model', lambda: Salary(**values)),
+        ('compiled validator', lambda: validate_salary(values)),
+    )
+    for title, func in cases:
+        seconds = min(timeit.repeat(func, number=number, repeat=3))
+        sys.stdout.write(f'{title:<20}{seconds / number * 1e6:10.2f} us/row\n')
+
+
+if __name__ == '__main__':
+    main()
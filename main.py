@@ -1,56 +1,313 @@
+import argparse
+import json
 import os
-import uuid
 from datetime import datetime
+from multiprocessing import freeze_support
+from typing import Optional
 
-from openpyxl import load_workbook
 from loguru import logger
 
-from src.handlers import (
-    load_salary,
-    load_salary_fund,
-    load_executive_salaries,
-    create_group_by_period_salary_data,
-    create_xml_file)
-from src.settings import Settings
+from src.settings import settings
 
-logger.add('report.log', enqueue=True)
+LOG_FILE = 'report.log'
+PROFILE_FILE = 'report.profile.json'
 
-settings = Settings()
+logger.add(LOG_FILE, enqueue=True)
 
 
-def main(base_dir: str):
+def main(
+        base_dir: str,
+        use_cache: bool = True,
+        profile: bool = False,
+        profile_json: bool = False,
+        pipeline: bool = False,
+        split_period: bool = False,
+        split_employees: int = 0,
+        delta: Optional[str] = None,
+):
     """
     Read xlsx file from input folder and create xml report for the pension fund in folder output
     :param base_dir: str - current working directory
+    :param use_cache: bool - load unchanged sheets from cache
+    :param profile: bool - print time and memory of conversion stages
+    :param profile_json: bool - write profile to json file next to log file
+    :param pipeline: bool - load sheets and write xml at the same time, without cache and profile
+    :param split_period: bool - write xml file for each period
+    :param split_employees: int - write xml files with at most this number of employees
+    :param delta: str - previous xml report, only changed periods generated, others copied from it
     :return: None
     """
+    from src.cache import create_cache
+
     logger.info('Start load data')
-    guid: str = str(uuid.uuid4())
+    report_file = os.path.join(base_dir, settings.input_dir, settings.report)
+    cache = create_cache(base_dir) if use_cache else None
+    if split_period or split_employees:
+        from src.shards import convert_report_sharded
+
+        convert_report_sharded(
+            report_file,
+            os.path.join(base_dir, settings.output_dir),
+            split_period,
+            split_employees,
+            settings.workers,
+            cache,
+        )
+        return
+    if delta:
+        from src.delta import convert_report_delta
+
+        convert_report_delta(report_file, delta, os.path.join(base_dir, settings.output_dir), cache)
+        return
+    if pipeline:
+        from src.pipeline import convert_report_pipelined
+
+        convert_report_pipelined(report_file, os.path.join(base_dir, settings.output_dir))
+        return
+    from src.converter import convert_report
+    from src.profiling import Profiler
+
+    profiler = Profiler(enabled=profile or profile_json)
+    convert_report(report_file, os.path.join(base_dir, settings.output_dir), cache, profiler)
+    profiler.log_summary(settings.report)
+    if profile_json:
+        profiler.write_json(PROFILE_FILE, report=report_file)
+
+
+def batch(base_dir: str, workers: int, use_cache: bool = True, profile: bool = False, profile_json: bool = False):
+    """
+    Convert all xlsx files from input folder in parallel
+    :return: bool - all files converted
+    """
+    from src.batch import convert_directory, log_summary
+    from src.cache import create_cache
+
+    logger.info('Start batch conversion')
+    results = convert_directory(
+        os.path.join(base_dir, settings.input_dir),
+        os.path.join(base_dir, settings.output_dir),
+        workers,
+        create_cache(base_dir) if use_cache else None,
+        profile or profile_json,
+    )
+    log_summary(results)
+    if profile_json:
+        with open(PROFILE_FILE, mode='w', encoding='utf-8') as result:
+            files = [{'report': item.report, 'error': item.error, 'stages': item.profile} for item in results]
+            json.dump({'files': files}, result, ensure_ascii=False, indent=4)
+    return all(result.success for result in results)
+
+
+def by_organization(base_dir: str, workers: int) -> bool:
+    """
+    Convert report with several organizations to xml file for each organization in parallel, without cache
+    :return: bool - all organizations converted
+    """
+    from src.organizations import convert_report_by_organization, log_summary as log_organizations
+
+    results = convert_report_by_organization(
+        os.path.join(base_dir, settings.input_dir, settings.report),
+        os.path.join(base_dir, settings.output_dir),
+        workers,
+    )
+    log_organizations(results)
+    return all(result.success for result in results)
+
+
+def validate(base_dir: str, workers: int) -> bool:
+    """
+    Validate all rows of report and write all errors to json file in output folder, xml not created
+    :return: bool - no errors
+    """
+    from src.validation import create_error_report_name, validate_report, write_error_report
 
-    file_name = f'ПФР_{settings.code_to}_СИоЗП_{settings.reg_number}_{datetime.now().strftime("%Y%m%d")}_{guid}.xml'
-    xml_file = os.path.join(base_dir, settings.output_dir, file_name)
     report_file = os.path.join(base_dir, settings.input_dir, settings.report)
+    report = validate_report(report_file, workers)
+    errors_file = os.path.join(base_dir, settings.output_dir, create_error_report_name(report_file))
+    write_error_report(report, errors_file)
+    logger.info(f'Errors report: {errors_file}')
+    return report.success
 
-    logger.info(f'Read file: {report_file}')
 
-    wb = load_workbook(filename=report_file, read_only=True)
-    salary_data = load_salary(wb['Раздел 1'])
-    salary_fund_data = load_salary_fund(wb['Раздел 2'])
-    executive_salary = load_executive_salaries(wb['Раздел 3'])
-    salary_by_period_data = create_group_by_period_salary_data(salary_data)
-    wb.close()
+def parse(base_dir: str, output: Optional[str] = None, use_cache: bool = True) -> str:
+    """
+    Read and validate xlsx file from input folder, write grouped data to intermediate file for `render`
+    :param output: str - intermediate file, by default name of report in output folder
+    :return: str - path to intermediate file
+    """
+    from src.cache import create_cache
+    from src.intermediate import INTERMEDIATE_EXTENSION, parse_report
 
-    logger.info('Generate xml file start')
-    create_xml_file(
-        xml_file,
-        salary_by_period_data,
-        salary_fund_data,
-        executive_salary,
-        guid,
-        salary_data,
+    report_file = os.path.join(base_dir, settings.input_dir, settings.report)
+    if output is None:
+        name = os.path.splitext(settings.report)[0] + INTERMEDIATE_EXTENSION
+        output = os.path.join(base_dir, settings.output_dir, name)
+    return parse_report(report_file, output, create_cache(base_dir) if use_cache else None)
+
+
+def render(
+        base_dir: str,
+        filename: str,
+        code_to: Optional[str] = None,
+        reg_number: Optional[str] = None,
+        guid: Optional[str] = None,
+        created_at: Optional[datetime] = None,
+) -> str:
+    """
+    Create xml report from intermediate file of `parse` in output folder, without reading xlsx file
+    :param code_to: str - code of pension fund office instead of CODE_TO
+    :param reg_number: str - registration number instead of REG_NUMBER
+    :param guid: str - GUID of resubmitted report, by default new
+    :param created_at: datetime - date and time of report, by default now
+    :return: str - path to xml file
+    """
+    from src.intermediate import render_report
+    from src.settings import override_settings
+
+    overrides = {key: value for key, value in (('code_to', code_to), ('reg_number', reg_number)) if value}
+    with override_settings(**overrides):
+        xml_file, _ = render_report(filename, os.path.join(base_dir, settings.output_dir), guid, created_at)
+    return xml_file
+
+
+def watch(base_dir: str, workers: int, use_cache: bool = True) -> None:
+    """Watch input folder and convert new or changed xlsx files until interrupted"""
+    import asyncio
+
+    from src.cache import create_cache
+    from src.watch import DirectoryWatcher
+
+    watcher = DirectoryWatcher(
+        os.path.join(base_dir, settings.input_dir),
+        os.path.join(base_dir, settings.output_dir),
+        workers,
+        create_cache(base_dir) if use_cache else None,
+        settings.watch_interval,
+        settings.watch_settle,
     )
-    logger.info(f'Complete generate xml file: {file_name}')
+    try:
+        asyncio.run(watcher.run())
+    except KeyboardInterrupt:
+        logger.info('Watch interrupted')
+
+
+def serve(base_dir: str, workers: int, use_cache: bool = True) -> None:
+    """Run conversion service with warm worker processes, jobs accepted over http"""
+    from src.cache import create_cache
+    from src.service import ConversionService, serve as serve_http
+
+    service = ConversionService(
+        base_dir,
+        settings.output_dir,
+        workers,
+        create_cache(base_dir) if use_cache else None,
+    )
+    serve_http(service, settings.service_host, settings.service_port)
+
+
+def check(base_dir: str) -> bool:
+    """
+    Check first sheet of report by columns with numpy: ranges of values and total accruals
+    :return: bool - no errors
+    """
+    from src.columnar import load_salary_columns
+    from src.converter import open_workbook
+
+    report_file = os.path.join(base_dir, settings.input_dir, settings.report)
+    logger.info(f'Check file: {report_file}')
+    wb = open_workbook(report_file)
+    columns = load_salary_columns(wb['Раздел 1'])
+    wb.close()
+    errors = columns.check()
+    for field, rows in errors.items():
+        logger.error(f'Error in field "{field}", rows: {", ".join(map(str, rows))}')
+    for (year, month), sums in columns.period_sums().items():
+        logger.info(f'Period {year}-{month:02d}: total accruals {sums["total_accruals"]:.2f}')
+    logger.info(f'Checked {len(columns)} rows, fields with errors: {len(errors)}')
+    return not errors
+
+
+def parse_args(args=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Конвертор xlsx отчета СИоЗП в xml для ПФР')
+    parser.add_argument('--batch', action='store_true', help='конвертировать все xlsx файлы из папки INPUT_DIR')
+    parser.add_argument(
+        '--workers', type=int, default=settings.workers, help='количество процессов в пакетном режиме')
+    parser.add_argument(
+        '--check', action='store_true', help='проверить лист "Раздел 1" по столбцам (нужен numpy) без создания xml')
+    parser.add_argument(
+        '--validate', action='store_true', help='проверить все строки и записать все ошибки в json без создания xml')
+    parser.add_argument('--profile', action='store_true', help='вывести время и память по этапам конвертации')
+    parser.add_argument(
+        '--profile-json', action='store_true', help=f'записать время и память по этапам в {PROFILE_FILE}')
+    parser.add_argument(
+        '--pipeline', action='store_true', help='читать листы параллельно и писать xml по мере готовности периодов')
+    parser.add_argument('--split-period', action='store_true', help='создать отдельный xml файл для каждого периода')
+    parser.add_argument(
+        '--split-employees', type=int, default=0, help='создать xml файлы не более чем с этим количеством сотрудников')
+    parser.add_argument(
+        '--delta', metavar='PREVIOUS_XML', help='создать xml заново только для измененных периодов предыдущего отчета')
+    parser.add_argument(
+        '--by-organization', action='store_true', help='создать отдельный xml файл для каждой организации (ИНН, КПП)')
+    parser.add_argument(
+        '--watch', action='store_true', help='следить за папкой INPUT_DIR и конвертировать новые и измененные файлы')
+    parser.add_argument(
+        '--serve', action='store_true', help='запустить службу конвертации (SERVICE_HOST:SERVICE_PORT)')
+    parser.add_argument('--no-cache', action='store_true', help='не использовать кэш проверенных листов')
+    parser.add_argument('--clear-cache', action='store_true', help='очистить кэш перед конвертацией')
+    commands = parser.add_subparsers(dest='command')
+    parse_parser = commands.add_parser('parse', help='проверить отчет и сохранить данные в промежуточный файл')
+    parse_parser.add_argument('--output', help='промежуточный файл, по умолчанию <имя отчета>.siozp в OUTPUT_DIR')
+    render_parser = commands.add_parser('render', help='создать xml из промежуточного файла без чтения xlsx')
+    render_parser.add_argument('file', help='промежуточный файл команды parse')
+    render_parser.add_argument('--code-to', help='код территориального органа ПФР вместо CODE_TO')
+    render_parser.add_argument('--reg-number', help='рег.номер вместо REG_NUMBER')
+    render_parser.add_argument('--guid', help='GUID отчета, по умолчанию новый')
+    render_parser.add_argument(
+        '--created-at', type=datetime.fromisoformat, help='дата и время отчета, например 2021-03-28T02:37:12')
+    return parser.parse_args(args)
 
 
 if __name__ == '__main__':
-    main(os.getcwd())
+    freeze_support()
+    arguments = parse_args()
+    if arguments.clear_cache:
+        from src.cache import create_cache
+
+        create_cache(os.getcwd()).clear()
+    if arguments.command == 'parse':
+        parse(os.getcwd(), arguments.output, not arguments.no_cache)
+        raise SystemExit(0)
+    if arguments.command == 'render':
+        render(
+            os.getcwd(),
+            arguments.file,
+            arguments.code_to,
+            arguments.reg_number,
+            arguments.guid,
+            arguments.created_at,
+        )
+        raise SystemExit(0)
+    if arguments.validate:
+        raise SystemExit(0 if validate(os.getcwd(), arguments.workers) else 1)
+    if arguments.check:
+        raise SystemExit(0 if check(os.getcwd()) else 1)
+    if arguments.watch:
+        watch(os.getcwd(), arguments.workers, not arguments.no_cache)
+        raise SystemExit(0)
+    if arguments.serve:
+        serve(os.getcwd(), arguments.workers, not arguments.no_cache)
+        raise SystemExit(0)
+    if arguments.by_organization:
+        raise SystemExit(0 if by_organization(os.getcwd(), arguments.workers) else 1)
+    profile_options = {'profile': arguments.profile, 'profile_json': arguments.profile_json}
+    if arguments.batch:
+        raise SystemExit(0 if batch(os.getcwd(), arguments.workers, not arguments.no_cache, **profile_options) else 1)
+    main(
+        os.getcwd(),
+        not arguments.no_cache,
+        pipeline=arguments.pipeline,
+        split_period=arguments.split_period,
+        split_employees=arguments.split_employees,
+        delta=arguments.delta,
+        **profile_options,
+    )
@@ -0,0 +1,82 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from loguru import logger
+
+from src.cache import SheetCache
+from src.converter import convert_report
+from src.profiling import Profiler
+
+REPORT_EXTENSIONS = ('.xlsx', '.xlsm')
+
+
+class BatchResult(NamedTuple):
+    report: str
+    xml_file: Optional[str] = None
+    error: Optional[str] = None
+    profile: Optional[List[Dict[str, Any]]] = None
+
+    @property
+    def success(self) -> bool:
+        return self.error is None
+
+
+def find_reports(input_dir: str) -> List[str]:
+    """All workbooks in folder, except temporary lock files of Excel `~$name.xlsx`"""
+    return sorted(
+        os.path.join(input_dir, name) for name in os.listdir(input_dir)
+        if name.lower().endswith(REPORT_EXTENSIONS) and not name.startswith('~$')
+    )
+
+
+def convert_file(
+        report_file: str,
+        output_dir: str,
+        cache: Optional[SheetCache] = None,
+        profile: bool = False,
+) -> BatchResult:
+    """Convert one workbook, error reported in result"""
+    profiler = Profiler(enabled=profile)
+    try:
+        xml_file = convert_report(report_file, output_dir, cache, profiler)
+    except Exception as e:
+        logger.exception(f'Error convert file: {report_file}')
+        return BatchResult(report_file, error=f'{type(e).__name__}: {e}', profile=profiler.dict() if profile else None)
+    profiler.log_summary(os.path.basename(report_file))
+    return BatchResult(report_file, xml_file=xml_file, profile=profiler.dict() if profile else None)
+
+
+def convert_directory(
+        input_dir: str,
+        output_dir: str,
+        workers: Optional[int] = None,
+        cache: Optional[SheetCache] = None,
+        profile: bool = False,
+) -> List[BatchResult]:
+    """
+    Convert every workbook in input folder in parallel processes.
+    Error in one workbook not abort others, it reported in result.
+    :param workers: int - number of processes, by default number of processors
+    :param cache: SheetCache - cache of validated sheets
+    :param profile: bool - measure stages of conversion for each file
+    :return: list of results in order of reports
+    """
+    reports = find_reports(input_dir)
+    if not reports:
+        logger.warning(f'No reports in folder: {input_dir}')
+        return []
+    with ProcessPoolExecutor(max_workers=workers or None) as executor:
+        futures = {executor.submit(convert_file, report, output_dir, cache, profile): report for report in reports}
+        results = {futures[future]: future.result() for future in as_completed(futures)}
+    return [results[report] for report in reports]
+
+
+def log_summary(results: List[BatchResult]) -> None:
+    for result in results:
+        if result.success:
+            logger.info(f'OK    {os.path.basename(result.report)} -> {os.path.basename(result.xml_file)}')
+        else:
+            logger.error(f'FAIL  {os.path.basename(result.report)}: {result.error}')
+    failed = sum(not result.success for result in results)
+    logger.info(f'Converted {len(results) - failed} of {len(results)} files, failed: {failed}')
@@ -0,0 +1,128 @@
+import hashlib
+import os
+import pickle
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+from zipfile import ZipFile
+
+from loguru import logger
+
+from src.settings import settings
+from src.xlsx import SHARED_STRINGS_PART, sheet_parts
+
+
+# change when format of cached rows or validation rules changed
+CACHE_VERSION = 2
+CACHE_EXTENSION = '.pickle'
+
+
+class SheetCache:
+    """
+    On-disk cache of validated sheet rows.
+    Key is hash of sheet xml and shared strings inside xlsx file, so
+    unchanged sheets load without openpyxl and pydantic.
+    Least recently used entries removed when total size more than `max_size` bytes.
+    """
+
+    def __init__(self, cache_dir: str, max_size: int):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def keys(report_file: str, model_by_sheet: dict) -> dict:
+        """Sheet name -> cache key for sheets of report"""
+        result = {}
+        with ZipFile(report_file) as archive:
+            parts = sheet_parts(archive)
+            names = set(archive.namelist())
+            shared_strings = archive.read(SHARED_STRINGS_PART) if SHARED_STRINGS_PART in names else b''
+            for sheet_name, model in model_by_sheet.items():
+                digest = hashlib.sha256()
+                key_values = (
+                    CACHE_VERSION,
+                    settings.reader,
+                    settings.allow_category_code,
+                    model.__name__,
+                    list(model.__fields__),
+                )
+                for value in key_values:
+                    digest.update(repr(value).encode('utf-8'))
+                digest.update(shared_strings)
+                digest.update(archive.read(parts[sheet_name]))
+                result[sheet_name] = digest.hexdigest()
+        return result
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + CACHE_EXTENSION)
+
+    def get(self, key: str) -> Optional[List[Any]]:
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as cache_file:
+                rows = pickle.load(cache_file)
+        except (OSError, pickle.PickleError, EOFError):
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            # evicted by other process after read
+            pass
+        return rows
+
+    def set(self, key: str, rows: List[Any]) -> None:
+        path = self._path(key)
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        with open(temp_path, 'wb') as cache_file:
+            pickle.dump(rows, cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+        self._evict()
+
+    def _entries(self) -> List[Tuple[str, os.stat_result]]:
+        """Path and stat of cache files, files removed by other process skipped"""
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if not entry.name.endswith(CACHE_EXTENSION):
+                continue
+            try:
+                entries.append((entry.path, entry.stat()))
+            except FileNotFoundError:
+                continue
+        return entries
+
+    def _evict(self) -> None:
+        entries = sorted(self._entries(), key=lambda entry: entry[1].st_mtime_ns)
+        total_size = sum(stat.st_size for _, stat in entries)
+        for path, stat in entries:
+            if total_size <= self.max_size:
+                break
+            total_size -= stat.st_size
+            try:
+                _remove(path)
+            except OSError:
+                # file opened by other process on Windows, removed on next eviction
+                pass
+
+    def clear(self) -> None:
+        for path, _ in self._entries():
+            _remove(path)
+        logger.info(f'Cache cleared: {self.cache_dir}')
+
+    def cached(self, key: str, rows: Iterable[Any]) -> Iterator[Any]:
+        """Pass rows through and store them in cache after last row"""
+        result = []
+        for row in rows:
+            result.append(row)
+            yield row
+        self.set(key, result)
+
+
+def _remove(path: str) -> None:
+    """Remove file, file already removed by other process ignored"""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def create_cache(base_dir: str) -> SheetCache:
+    return SheetCache(os.path.join(base_dir, settings.cache_dir), settings.cache_size * 1024 * 1024)
@@ -0,0 +1,161 @@
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+
+
+from src.handlers import SALARY_MIN_ROW, iter_sheet_values
+from src.helpers import get_mount_number
+from src.models import Salary
+from src.settings import settings
+
+if TYPE_CHECKING:
+    from openpyxl import worksheet
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+
+# components of `total_accruals`, columns 16, 18-22, 24, 25, 27, 29-34 of first sheet,
+# total also includes payments not listed in columns, so it is not less than sum of components
+ACCRUAL_FIELDS = (
+    'accruals_based_on_tariff_rates',
+    'accruals_for_hazard_class',
+    'additional_payment_for_combining',
+    'other_compensation_payments',
+    'other_compensation_payments_regional',
+    'awards',
+    'payment_for_work_experience',
+    'rural_surcharge',
+    'additional_payment_for_presence_of_qualifying_category',
+    'additional_payment_for_academic_degree',
+    'additional_payment_for_mentoring',
+    'additional_payment_young_specialists',
+    'other_additional_payment',
+    'other_payments',
+    'compensation_payments_for_district_regulation',
+)
+TOTAL_FIELD = 'total_accruals'
+TOTAL_TOLERANCE = 0.01
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError('Для проверки по столбцам нужен numpy: pip install numpy')
+
+
+def _is_numeric_field(name: str) -> bool:
+    return issubclass(Salary.__fields__[name].type_, (int, float))
+
+
+def _month_number(value):
+    try:
+        return get_mount_number(value)
+    except (TypeError, ValueError):
+        return value
+
+
+def _to_float(values) -> Tuple['np.ndarray', 'np.ndarray']:
+    """Float column and mask of values that are not numbers, empty values are nan"""
+    empty = np.equal(values, None)
+    result = np.full(len(values), np.nan)
+    try:
+        result[~empty] = values[~empty].astype(float)
+        return result, np.zeros(len(values), dtype=bool)
+    except (TypeError, ValueError):
+        pass
+    # column with errors: find values that are not numbers
+    invalid = np.zeros(len(values), dtype=bool)
+    for index in np.flatnonzero(~empty):
+        try:
+            result[index] = float(values[index])
+        except (TypeError, ValueError):
+            invalid[index] = True
+    return result, invalid
+
+
+class SalaryColumns:
+    """
+    Numeric columns of first sheet as numpy arrays for checks and sums without per-row validation.
+    `row_numbers` - numbers of rows in sheet.
+    """
+
+    def __init__(self, columns: Dict[str, 'np.ndarray'], invalid: Dict[str, 'np.ndarray'], row_numbers: 'np.ndarray'):
+        self.columns = columns
+        self.invalid = invalid
+        self.row_numbers = row_numbers
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple], min_row: int = SALARY_MIN_ROW) -> 'SalaryColumns':
+        """Columns from raw values of sheet rows, fields in order of sheet columns"""
+        _require_numpy()
+        fields = list(Salary.__fields__)
+        values = [tuple(row[:len(fields)]) + (None,) * (len(fields) - len(row)) for row in rows]
+        table = np.array(values, dtype=object).reshape(len(values), len(fields))
+        columns, invalid = {}, {}
+        for index, name in enumerate(fields):
+            if not _is_numeric_field(name):
+                continue
+            column = table[:, index]
+            if name == 'month':
+                names = {value: _month_number(value) for value in set(column) if isinstance(value, str)}
+                column = np.array([names.get(value, value) for value in column], dtype=object)
+            columns[name], invalid[name] = _to_float(column)
+        return cls(columns, invalid, np.arange(min_row, min_row + len(values)))
+
+    def __len__(self) -> int:
+        return len(self.row_numbers)
+
+    def _rows(self, mask: 'np.ndarray') -> List[int]:
+        return self.row_numbers[mask].tolist()
+
+    def check_ranges(self) -> Dict[str, List[int]]:
+        """
+        Row numbers with error by field: not number, empty value of field that not allow None,
+        value out of range (ge/le of model) or not allowed category code
+        """
+        errors = {}
+        for name, column in self.columns.items():
+            field = Salary.__fields__[name]
+            empty = np.isnan(column)
+            failed = self.invalid[name].copy()
+            if not field.allow_none:
+                failed |= empty & ~self.invalid[name]
+            if field.field_info.ge is not None:
+                failed |= ~empty & (column < field.field_info.ge)
+            if field.field_info.le is not None:
+                failed |= ~empty & (column > field.field_info.le)
+            if name == 'staff_category_code':
+                failed |= ~empty & ~np.isin(column, settings.allow_category_code)
+            if failed.any():
+                errors[name] = self._rows(failed)
+        return errors
+
+    def check_totals(self, tolerance: float = TOTAL_TOLERANCE) -> List[int]:
+        """Row numbers where sum of accrual fields is greater than `total_accruals`"""
+        components = np.nansum([self.columns[name] for name in ACCRUAL_FIELDS], axis=0)
+        total = np.nan_to_num(self.columns[TOTAL_FIELD])
+        return self._rows(components - total > tolerance)
+
+    def check(self, tolerance: float = TOTAL_TOLERANCE) -> Dict[str, List[int]]:
+        """All checks, row numbers with error by field"""
+        errors = self.check_ranges()
+        totals = self.check_totals(tolerance)
+        if totals:
+            errors.setdefault(TOTAL_FIELD, [])
+            errors[TOTAL_FIELD] = sorted(set(errors[TOTAL_FIELD]) | set(totals))
+        return errors
+
+    def period_sums(self, fields: Optional[Iterable[str]] = None) -> Dict[Tuple[int, int], Dict[str, float]]:
+        """Sums of fields by period (year, month), by default accrual fields and total"""
+        fields = list(fields or ACCRUAL_FIELDS + (TOTAL_FIELD,))
+        keys = np.nan_to_num(self.columns['year']) * 100 + np.nan_to_num(self.columns['month'])
+        periods, inverse = np.unique(keys, return_inverse=True)
+        sums = {name: np.bincount(inverse, weights=np.nan_to_num(self.columns[name])) for name in fields}
+        return {
+            (int(period // 100), int(period % 100)): {name: float(sums[name][index]) for name in fields}
+            for index, period in enumerate(periods)
+        }
+
+
+def load_salary_columns(ws: 'worksheet') -> SalaryColumns:
+    return SalaryColumns.from_rows(iter_sheet_values(ws, SALARY_MIN_ROW))
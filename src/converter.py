@@ -0,0 +1,128 @@
+import os
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from loguru import logger
+
+from src.handlers import (
+    load_salary,
+    load_salary_fund,
+    load_executive_salaries,
+    create_group_by_period_salary_data,
+    create_xml_file)
+from src.cache import SheetCache
+from src.models import Salary, SalaryFund, ExecutiveSalary, Period
+from src.profiling import Profiler
+from src.row_hashes import report_hashes, store_hashes
+from src.settings import settings
+from src.xlsx import XLSXReader
+
+
+SHEETS = (
+    ('Раздел 1', Salary, load_salary),
+    ('Раздел 2', SalaryFund, load_salary_fund),
+    ('Раздел 3', ExecutiveSalary, load_executive_salaries),
+)
+
+
+def create_xml_file_name(guid: str) -> str:
+    return f'ПФР_{settings.code_to}_СИоЗП_{settings.reg_number}_{datetime.now().strftime("%Y%m%d")}_{guid}.xml'
+
+
+def open_workbook(report_file: str):
+    """Workbook for loaders, reader engine from settings: `openpyxl` or fast `xml`"""
+    if settings.reader == 'xml':
+        return XLSXReader(report_file)
+    from openpyxl import load_workbook
+
+    return load_workbook(filename=report_file, read_only=True)
+
+
+@contextmanager
+def report_sources(
+        report_file: str,
+        cache: Optional[SheetCache] = None,
+        profiler: Optional[Profiler] = None,
+) -> Iterator[Dict[str, Iterator]]:
+    """
+    Iterators of validated rows by sheet name, workbook closed on exit.
+    Sheets found in cache not read, workbook not opened if all sheets in cache.
+    """
+    profiler = profiler or Profiler(enabled=False)
+    logger.info(f'Read file: {report_file}')
+    keys = {}
+    if cache:
+        with profiler.stage('cache keys'):
+            keys = cache.keys(report_file, {name: model for name, model, _ in SHEETS})
+    wb = None
+    sources = {}
+    try:
+        for name, _, loader in SHEETS:
+            rows = cache.get(keys[name]) if cache else None
+            if rows is not None:
+                logger.info(f'Sheet "{name}" loaded from cache')
+            else:
+                if wb is None:
+                    with profiler.stage('open workbook'):
+                        wb = open_workbook(report_file)
+                rows = loader(wb[name])
+                if cache:
+                    rows = cache.cached(keys[name], rows)
+            sources[name] = profiler.iterate(loader.__name__, rows)
+        yield sources
+    finally:
+        if wb is not None:
+            wb.close()
+
+
+def load_report(
+        report_file: str,
+        cache: Optional[SheetCache] = None,
+        profiler: Optional[Profiler] = None,
+) -> Tuple[List[Period], List[SalaryFund], List[ExecutiveSalary]]:
+    """Load and validate sheets of report, salary grouped by period"""
+    profiler = profiler or Profiler(enabled=False)
+    with report_sources(report_file, cache, profiler) as sources:
+        with profiler.stage('create_group_by_period_salary_data'):
+            salary_by_period_data = create_group_by_period_salary_data(sources['Раздел 1'])
+        salary_fund_data = list(sources['Раздел 2'])
+        executive_salary = list(sources['Раздел 3'])
+    return salary_by_period_data, salary_fund_data, executive_salary
+
+
+def convert_report(
+        report_file: str,
+        output_dir: str,
+        cache: Optional[SheetCache] = None,
+        profiler: Optional[Profiler] = None,
+) -> str:
+    """
+    Convert one xlsx report to xml file for the pension fund
+    :param report_file: str - path to xlsx report
+    :param output_dir: str - folder for xml file
+    :param cache: SheetCache - cache of validated sheets, without cache sheets always read
+    :param profiler: Profiler - measure stages of conversion
+    :return: str - path to created xml file, hashes of its rows for `--delta` written next to it
+    """
+    profiler = profiler or Profiler(enabled=False)
+    guid: str = str(uuid.uuid4())
+    xml_file = os.path.join(output_dir, create_xml_file_name(guid))
+
+    salary_by_period_data, salary_fund_data, executive_salary = load_report(report_file, cache, profiler)
+
+    logger.info('Generate xml file start')
+    with profiler.stage('create_xml_file'):
+        create_xml_file(
+            xml_file,
+            salary_by_period_data,
+            salary_fund_data,
+            executive_salary,
+            guid,
+            profiler=profiler,
+        )
+    with profiler.stage('store_hashes'):
+        store_hashes(xml_file, report_hashes(salary_by_period_data))
+    logger.info(f'Complete generate xml file: {os.path.basename(xml_file)}')
+    return xml_file
@@ -0,0 +1,224 @@
+import hashlib
+import mmap
+import os
+import re
+import uuid
+from contextlib import contextmanager
+from functools import lru_cache
+from io import BytesIO
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from loguru import logger
+
+from src.cache import SheetCache
+from src.converter import create_xml_file_name, report_sources
+from src.handlers import SalaryIndex, add_employee_nodes, create_period, create_xml_file, index_salary_data
+from src.helpers import VALUE_CACHE_SIZE
+from src.models import Employee, Period
+from src.records import SalaryRecord
+from src.row_hashes import PeriodHashes, PeriodKey, content_digest, index_hashes, load_hashes, store_hashes
+from src.settings import settings
+from src.writer import XMLStreamWriter
+
+SALARY_START = '<СЗП>'.encode()
+SALARY_END = '</СЗП>'.encode()
+PERIOD_START = '<Период>'.encode()
+PERIOD_END = '</Период>'.encode()
+EMPLOYEES_START = '<Работник>'.encode()
+EMPLOYEES_END = '</Работник>'.encode()
+EMPLOYEE_START = '<УТ2:ФИО>'.encode()
+REPORT_START = '<СИоЗП>'.encode()
+YEAR = re.compile(r'<Год>(\d+)</Год>'.encode())
+MONTH = re.compile(r'<Месяц>(\d+)</Месяц>'.encode())
+SNILS = re.compile(r'<УТ2:СНИЛС>(\d+)</УТ2:СНИЛС>'.encode())
+# indent between nodes of pretty xml
+INDENT = re.compile(rb'>\s+<')
+
+
+class PreviousReportError(ValueError):
+    """File is not xml report or first part not found"""
+
+
+class PreviousReport(NamedTuple):
+    pretty: bool
+    # digest of file content, row hashes stored for other content not used
+    digest: str
+    data: mmap.mmap
+    # offsets of `Период` nodes of first part
+    blocks: Dict[PeriodKey, Tuple[int, int]]
+
+    def block(self, key: PeriodKey) -> bytes:
+        start, end = self.blocks[key]
+        return self.data[start:end]
+
+
+class DeltaResult(NamedTuple):
+    xml_file: str
+    copied: List[PeriodKey]
+    regenerated: List[PeriodKey]
+    removed: List[PeriodKey]
+
+
+def _hash(data: bytes) -> bytes:
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+@lru_cache(maxsize=VALUE_CACHE_SIZE)
+def _name_items(full_name: str) -> Tuple[Tuple[str, str], ...]:
+    return tuple(Employee(snils=0, full_name=full_name, work_experience=0).represent_name_to_xml())
+
+
+def node_hashes(employees_index: Dict[int, List[SalaryRecord]]) -> PeriodHashes:
+    """
+    Hashes of employees of period from index snils -> [SalaryRecord], in order of `create_period`.
+    Hash of employee nodes written as compact xml, compared with previous report without row hashes.
+    """
+    employees = sorted(employees_index.items(), key=lambda item: item[1][0].employee_name)
+    hashes = []
+    stream = BytesIO()
+    writer = XMLStreamWriter(stream, indent=None)
+    for snils, salary_rows in employees:
+        stream.seek(0)
+        stream.truncate()
+        first_row = salary_rows[0]
+        add_employee_nodes(
+            writer, _name_items(first_row.employee_name), first_row.snils, first_row.work_experience, salary_rows)
+        hashes.append((snils, _hash(stream.getvalue())))
+    return tuple(hashes)
+
+
+def block_node_hashes(block: bytes) -> PeriodHashes:
+    """Hashes of employee nodes of serialized `Период` node, indent removed as in compact xml"""
+    block = INDENT.sub(b'><', block)
+    start = block.index(EMPLOYEES_START) + len(EMPLOYEES_START)
+    employees = block[start:block.rindex(EMPLOYEES_END)].split(EMPLOYEE_START)[1:]
+    return tuple((int(SNILS.search(employee).group(1)), _hash(EMPLOYEE_START + employee)) for employee in employees)
+
+
+def _iter_period_blocks(data: mmap.mmap, start: int, end: int) -> Iterator[Tuple[PeriodKey, int, int]]:
+    """Period and offsets of `Период` nodes between `start` and `end`"""
+    position = start
+    while True:
+        position = data.find(PERIOD_START, position, end)
+        if position == -1:
+            return
+        block_end = data.find(PERIOD_END, position, end)
+        if block_end == -1:
+            raise ValueError('нет закрывающего тега Период')
+        block_end += len(PERIOD_END)
+        year = int(YEAR.search(data, position, block_end).group(1))
+        month = int(MONTH.search(data, position, block_end).group(1))
+        yield (year, month), position, block_end
+        position = block_end
+
+
+@contextmanager
+def read_previous_report(xml_file: str) -> Iterator[PreviousReport]:
+    """Periods of first part of xml report created before, file mapped to memory until exit"""
+    with open(xml_file, mode='rb') as report:
+        if os.fstat(report.fileno()).st_size == 0:
+            # empty file can't be mapped
+            raise PreviousReportError(f'Файл не является отчетом СИоЗП: {xml_file}')
+        with mmap.mmap(report.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            start, salary_start, salary_end = data.find(REPORT_START), data.find(SALARY_START), data.find(SALARY_END)
+            if -1 in (start, salary_start, salary_end):
+                raise PreviousReportError(f'Файл не является отчетом СИоЗП: {xml_file}')
+            try:
+                blocks = {key: (block_start, block_end)
+                          for key, block_start, block_end in _iter_period_blocks(data, salary_start, salary_end)}
+            except (AttributeError, ValueError) as e:
+                raise PreviousReportError(f'Ошибка чтения периодов отчета {xml_file}: {e}') from e
+            pretty = data[start + len(REPORT_START):start + len(REPORT_START) + 1] == b'\n'
+            yield PreviousReport(pretty, content_digest(data), data, blocks)
+
+
+def _first_row(index: SalaryIndex) -> Optional[SalaryRecord]:
+    """Row of organization node: first row of first employee of first period"""
+    if not index:
+        return None
+    employees_index = index[min(index)]
+    return min(employees_index.values(), key=lambda salary_rows: salary_rows[0].employee_name)[0]
+
+
+def _is_unchanged(
+        previous: PreviousReport,
+        previous_hashes: Optional[Dict[PeriodKey, PeriodHashes]],
+        key: PeriodKey,
+        employees_index: Dict[int, List[SalaryRecord]],
+        hashes: PeriodHashes,
+) -> bool:
+    """Compare period by stored row hashes, without them by employee nodes of previous report"""
+    if key not in previous.blocks:
+        return False
+    if previous_hashes is not None:
+        return previous_hashes.get(key) == hashes
+    try:
+        previous_nodes = block_node_hashes(previous.block(key))
+    except (AttributeError, ValueError) as e:
+        raise PreviousReportError(f'Ошибка чтения периода {key[0]}-{key[1]:02d} предыдущего отчета: {e}') from e
+    return len(previous_nodes) == len(hashes) and previous_nodes == node_hashes(employees_index)
+
+
+def convert_report_delta(
+        report_file: str,
+        previous_xml: str,
+        output_dir: str,
+        cache: Optional[SheetCache] = None,
+) -> DeltaResult:
+    """
+    Convert report corrected after `previous_xml` was created from it.
+    Employees of each period compared by hashes of their rows stored next to previous report
+    (`<xml>.hashes`), without them by hashes of employee nodes written as compact xml.
+    Only changed periods grouped and written again, unchanged `Период` nodes copied as bytes.
+    Result is equal to full conversion except GUID and date, hashes of its rows written next to it.
+    """
+    pretty = settings.xml_pretty
+    logger.info(f'Read previous report: {previous_xml}')
+    with read_previous_report(previous_xml) as previous:
+        previous_hashes = load_hashes(previous_xml, previous.digest)
+        if previous_hashes is None:
+            logger.warning('Row hashes of previous report not found, employees compared by xml nodes')
+        with report_sources(report_file, cache) as sources:
+            index = index_salary_data(sources['Раздел 1'])
+            salary_fund_data = list(sources['Раздел 2'])
+            executive_salary = list(sources['Раздел 3'])
+
+        hashes = {key: index_hashes(employees_index) for key, employees_index in index.items()}
+        copied, regenerated = [], []
+        if previous.pretty != pretty:
+            logger.warning('Previous report written with other XML_PRETTY, all periods will be generated')
+            regenerated = sorted(index)
+        else:
+            for key in sorted(index):
+                if _is_unchanged(previous, previous_hashes, key, index[key], hashes[key]):
+                    copied.append(key)
+                else:
+                    regenerated.append(key)
+        removed = sorted(set(previous.blocks) - set(index))
+        copied_keys = set(copied)
+
+        def periods() -> Iterator[Union[Period, bytes]]:
+            for key in sorted(index):
+                if key in copied_keys:
+                    yield previous.block(key)
+                else:
+                    yield create_period(*key, index[key])
+
+        guid = str(uuid.uuid4())
+        xml_file = os.path.join(output_dir, create_xml_file_name(guid))
+        logger.info('Generate xml file start')
+        create_xml_file(
+            xml_file,
+            periods(),
+            salary_fund_data,
+            executive_salary,
+            guid,
+            pretty=pretty,
+            organization=_first_row(index),
+        )
+    store_hashes(xml_file, hashes)
+    for year, month in regenerated:
+        logger.info(f'Period {year}-{month:02d} generated')
+    logger.info(f'Periods copied: {len(copied)}, generated: {len(regenerated)}, removed: {len(removed)}')
+    logger.info(f'Complete generate xml file: {os.path.basename(xml_file)}')
+    return DeltaResult(xml_file, copied, regenerated, removed)
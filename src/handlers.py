@@ -1,195 +1,260 @@
+import os
 from datetime import datetime
-from typing import List, Any
-from xml.etree import ElementTree
-from xml.dom.minidom import parseString
+from itertools import chain, islice
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
-
-from openpyxl import worksheet
 from loguru import logger
-from pydantic import (
-    ValidationError,
-    parse_obj_as,
-)
+from pydantic import ValidationError
 
 from src.models import Salary, SalaryFund, ExecutiveSalary, Period, Employee
-from src.settings import Settings
-
-
-settings = Settings()
-
-
-def _create_list_of_dict_values_for_model(model, list_of_values: List[List]) -> List[dict]:
-    result = []
-    fields = model.__fields__.keys()
-    for item in list_of_values:
-        result.append(dict(zip(fields, item)))
-    return result
-
-
-def _get_value_list(rows, for_row: int) -> List[List[int or float or None]]:
-    values = []
-    for i, row in enumerate(rows):
-        if i >= for_row:
-            row_values = []
-            for cell in row:
-                row_values.append(cell.value)
-            values.append(row_values)
-    return values
-
-
-def _add_child_nodes(parent_node, data: List[Any]) -> None:
+from src.profiling import Profiler
+from src.records import SalaryRecord, validate_salary
+from src.settings import settings
+from src.writer import INDENT, XMLStreamWriter
+
+if TYPE_CHECKING:
+    from openpyxl import worksheet
+
+
+# first row with data on sheets
+SALARY_MIN_ROW = 6
+SALARY_FUND_MIN_ROW = 5
+EXECUTIVE_SALARY_MIN_ROW = 4
+# rows checked after first blank row to warn about data not loaded, formatted empty rows below are not read
+BLANK_ROW_LOOKAHEAD = 10
+
+# xml written to temporary file, renamed to report file when complete
+PART_SUFFIX = '.part'
+
+XML_NAMESPACES = {
+    'xmlns': 'http://пф.рф/СИоЗП/2021-03-15',
+    'xmlns:УТ2': 'http://пф.рф/УТ/2017-08-21',
+    'xmlns:АФ5': 'http://пф.рф/АФ/2018-12-07',
+}
+
+
+def _is_blank(row: Tuple) -> bool:
+    return all(value is None for value in row)
+
+
+def iter_sheet_values(ws: 'worksheet', min_row: int) -> Iterator[Tuple]:
+    """
+    Row values from `min_row` (1-based) up to the first fully blank row.
+    Rows after blank row not loaded, warning logged if one of next `BLANK_ROW_LOOKAHEAD` rows is not empty.
+    """
+    rows = ws.iter_rows(min_row=min_row, values_only=True)
+    for row_number, row in enumerate(rows, start=min_row):
+        if _is_blank(row):
+            break
+        yield row
+    else:
+        return
+    for skipped_number, row in enumerate(islice(rows, BLANK_ROW_LOOKAHEAD), start=row_number + 1):
+        if not _is_blank(row):
+            logger.warning(
+                f'Sheet "{ws.title}": rows after blank row {row_number} not loaded, first is {skipped_number}')
+            return
+
+
+def _create_model(model) -> Callable[[dict], Any]:
+    return lambda values: model(**values)
+
+
+def _iter_models(
+        model,
+        ws: 'worksheet',
+        min_row: int,
+        validate: Optional[Callable[[dict], Any]] = None,
+) -> Iterator[Any]:
+    """
+    Validate rows one at a time, fields of model in order of sheet columns
+    :param validate: callable - create instance from dict of values, by default model
+    """
+    fields = list(model.__fields__)
+    validate = validate or _create_model(model)
+    for row_number, row in enumerate(iter_sheet_values(ws, min_row), start=min_row):
+        try:
+            yield validate(dict(zip(fields, row)))
+        except ValidationError as e:
+            logger.error(f'Error in sheet "{ws.title}" row {row_number}: {e}')
+            raise
+
+
+def _add_child_nodes(writer: XMLStreamWriter, data: List[Any]) -> None:
     for item in data:
-        child_node = ElementTree.SubElement(parent_node, 'Период')
-        for key, value in item.represent_to_xml():
-            node = ElementTree.SubElement(child_node, key)
-            node.text = value
-
-
-def _add_period_nodes(parent_node, data: List[Any]) -> None:
+        with writer.node('Период'):
+            writer.elements(item.represent_to_xml())
+
+
+def add_employee_nodes(
+        writer: XMLStreamWriter,
+        name_items: Iterable[Tuple[str, str]],
+        snils: int,
+        work_experience: int,
+        salary_rows: Iterable[Any],
+) -> None:
+    """Nodes of employee in period, also used to compare with previous report without row hashes (src.delta)"""
+    with writer.node('УТ2:ФИО'):
+        writer.elements(name_items)
+    writer.element('УТ2:СНИЛС', str(snils))
+    writer.element('ОбщийСтаж', str(work_experience))
+    for salary_item in salary_rows:
+        with writer.node('СЗПД'):
+            writer.elements(salary_item.represent_to_xml())
+
+
+def _add_period_nodes(writer: XMLStreamWriter, data: Iterable[Union[Period, bytes]]) -> None:
+    """Periods of first part, bytes - serialized `Период` node written as is"""
     for item in data:
-        child_node = ElementTree.SubElement(parent_node, 'Период')
-        sub_nodes = ElementTree.SubElement(child_node, 'ОтчетныйПериод')
-        for key, value in item.represent_to_xml():
-            node = ElementTree.SubElement(sub_nodes, key)
-            node.text = value
-        parent_employee_node = ElementTree.SubElement(child_node, 'Работник')
-        for employee in item.employee:
-
-            if employee.salary:
-                employee_node = ElementTree.SubElement(parent_employee_node, 'УТ2:ФИО')
-                for key, value in employee.represent_name_to_xml():
-                    node = ElementTree.SubElement(employee_node, key)
-                    node.text = value
-                node = ElementTree.SubElement(parent_employee_node, 'УТ2:СНИЛС')
-                node.text = str(employee.snils)
-                node = ElementTree.SubElement(parent_employee_node, 'ОбщийСтаж')
-                node.text = str(employee.work_experience)
-                for salary_item in employee.salary:
-                    salary_root_node = ElementTree.SubElement(parent_employee_node, 'СЗПД')
-
-                    for key, value in salary_item.represent_to_xml():
-                        node = ElementTree.SubElement(salary_root_node, key)
-                        node.text = value
-
-
-def _add_organization_node(root_node, salary_data: List, fund_data: List) -> None:
-    parent_node = ElementTree.SubElement(root_node, 'Организация')
-    for key, value in salary_data[0].represent_organization_to_xml():
-        node = ElementTree.SubElement(parent_node, key)
-        node.text = value
-    for key, value in fund_data[0].represent_organization_to_xml():
-        node = ElementTree.SubElement(parent_node, key)
-        node.text = value
-
-
-def _add_salary_node(root_node, data) -> None:
-    parent_node = ElementTree.SubElement(root_node, 'СЗП')
-    _add_period_nodes(parent_node, data)
-
-
-def _add_salary_fond_node(root_node, data) -> None:
-    parent_node = ElementTree.SubElement(root_node, 'ФондЗП')
-    _add_child_nodes(parent_node, data)
-
-
-def _add_executive_salary_node(root_node, data) -> None:
-    parent_node = ElementTree.SubElement(root_node, 'СЗПРук')
-    _add_child_nodes(parent_node, data)
-
-
-def _add_system_node(root_node, guid) -> None:
-    parent_node = ElementTree.SubElement(root_node, 'СлужебнаяИнформация')
-    node = ElementTree.SubElement(parent_node, 'АФ5:GUID')
-    node.text = guid
-    node = ElementTree.SubElement(parent_node, 'АФ5:ДатаВремя')
-    node.text = datetime.now().isoformat()
-
-
-def create_xml_file(filename, salary_data, salary_fund_data, executive_salary, guid, salary_emp_data):
-    root = ElementTree.Element('ЭДПФР', xmlns='http://пф.рф/СИоЗП/2021-03-15')
-    root.set('xmlns:УТ2', 'http://пф.рф/УТ/2017-08-21')
-    root.set('xmlns:АФ5', 'http://пф.рф/АФ/2018-12-07')
-    main_node = ElementTree.Element('СИоЗП')
-    root.append(main_node)
-    # Organization info
-    _add_organization_node(main_node, salary_emp_data, salary_fund_data)
-    # 1 part
-    _add_salary_node(main_node, salary_data)
-    # Salary found 2 part
-    _add_salary_fond_node(main_node, salary_fund_data)
-    # 3 part
-    _add_executive_salary_node(main_node, executive_salary)
-    # system info
-    _add_system_node(main_node, guid)
-    # for pretty file without minification
-    # if not need pretty
-    #
-    # code:
-    # tree = ElementTree.ElementTree(root)
-    # tree.write(filename, encoding='utf-8', xml_declaration=True)
-    #
-    # And delete code further in function
-    xml_string = ElementTree.tostring(
-        root, encoding='utf-8', method='xml', xml_declaration=True, short_empty_elements=True)
-    xml = parseString(xml_string)
-    xml_pretty_str = xml.toprettyxml(encoding='utf-8')
-    with open(filename, mode='wb') as result:
-        result.write(xml_pretty_str)
-
-
-def _create_list_with_instances_from_salary_data(instance, salary_data, fields: List):
-    # for Period
-    if len(fields) == 2:
-        unique_values = list(set(list(map(lambda item: (item.dict()[fields[0]], item.dict()[fields[1]]), salary_data))))
-    else:
-        # for Employee
-        unique_values = list(set(list(
-            map(lambda item: (item.dict()[fields[0]], item.dict()[fields[1]], item.dict()[fields[2]]), salary_data))))
-    unique_values.sort(key=lambda x: x[1])
-    source = _create_list_of_dict_values_for_model(instance, unique_values)
-    return parse_obj_as(List[instance], source)
-
-
-def load_salary(ws: worksheet) -> List[Salary]:
-    values = _get_value_list(ws.rows, 5)
-    dict_values = _create_list_of_dict_values_for_model(Salary, values)
+        if isinstance(item, bytes):
+            writer.write_raw(item)
+            continue
+        with writer.node('Период'):
+            with writer.node('ОтчетныйПериод'):
+                writer.elements(item.represent_to_xml())
+            with writer.node('Работник'):
+                for employee in item.employee:
+                    if employee.salary:
+                        add_employee_nodes(
+                            writer,
+                            employee.represent_name_to_xml(),
+                            employee.snils,
+                            employee.work_experience,
+                            employee.salary,
+                        )
+
+
+def _add_organization_node(writer: XMLStreamWriter, salary_row: SalaryRecord, fund_data: List) -> None:
+    with writer.node('Организация'):
+        writer.elements(salary_row.represent_organization_to_xml())
+        writer.elements(fund_data[0].represent_organization_to_xml())
+
+
+def _add_salary_node(writer: XMLStreamWriter, data) -> None:
+    with writer.node('СЗП'):
+        _add_period_nodes(writer, data)
+
+
+def _add_salary_fond_node(writer: XMLStreamWriter, data) -> None:
+    with writer.node('ФондЗП'):
+        _add_child_nodes(writer, data)
+
+
+def _add_executive_salary_node(writer: XMLStreamWriter, data) -> None:
+    with writer.node('СЗПРук'):
+        _add_child_nodes(writer, data)
+
+
+def _add_system_node(writer: XMLStreamWriter, guid: str, created_at: Optional[datetime] = None) -> None:
+    with writer.node('СлужебнаяИнформация'):
+        writer.element('АФ5:GUID', guid)
+        writer.element('АФ5:ДатаВремя', (created_at or datetime.now()).isoformat())
+
+
+def create_xml_file(
+        filename,
+        salary_data,
+        salary_fund_data,
+        executive_salary,
+        guid,
+        pretty: Optional[bool] = None,
+        created_at: Optional[datetime] = None,
+        profiler: Optional[Profiler] = None,
+        organization: Optional[SalaryRecord] = None,
+        totals: bool = True,
+):
+    """
+    Write xml report to file incrementally, without building whole document in memory.
+    File written as `<filename>.part` and renamed when complete, so error not leave truncated report.
+    :param salary_data: iterable of Period - periods may be produced during writing,
+        bytes - `Период` node copied from other report
+    :param pretty: bool - write indented xml as output/example.xml, by default from settings
+    :param created_at: datetime - date and time of report in system info, by default now
+    :param profiler: Profiler - measure time of writes to file
+    :param organization: SalaryRecord - row with organization info, by default first row of first period
+    :param totals: bool - write sections ФондЗП and СЗПРук, without them for next documents of split report
+    """
+    if pretty is None:
+        pretty = settings.xml_pretty
+    periods = iter(salary_data)
+    first_period = next(periods, None)
+    if first_period is None:
+        raise ValueError('Нет данных о заработной плате (Раздел 1)')
+    if organization is None:
+        organization = first_period.employee[0].salary[0]
+    part_file = f'{filename}{PART_SUFFIX}'
     try:
-        return parse_obj_as(List[Salary], dict_values)
-    except ValidationError as e:
-        logger.error(e)
-
-
-def load_salary_fund(ws: worksheet) -> List[SalaryFund]:
-    values = _get_value_list(ws.rows, 4)
-    dict_values = _create_list_of_dict_values_for_model(SalaryFund, values)
-    return parse_obj_as(List[SalaryFund], dict_values)
-
-
-def load_executive_salaries(ws: worksheet) -> List[ExecutiveSalary]:
-    values = _get_value_list(ws.rows, 3)
-    dict_values = _create_list_of_dict_values_for_model(ExecutiveSalary, values)
-    return parse_obj_as(List[ExecutiveSalary], dict_values)
-
-
-def create_group_by_period_salary_data(salary_data) -> List[Period]:
-    periods = _create_list_with_instances_from_salary_data(Period, salary_data, ['year', 'month'])
-    # add employees to period
-    for item in periods:
-        employees = _create_list_with_instances_from_salary_data(
-            Employee,
-            salary_data,
-            ['snils', 'employee_name', 'work_experience'],
-        )
-        item.employee = employees
-    # add salary for employee in equal period
-    for period_item in periods:
-        for employee in period_item.employee:
-            for salary_item in salary_data:
-
-                is_equal_year = salary_item.year == period_item.year
-                is_equal_month = salary_item.month == period_item.month
-                is_equal_snils = employee.snils == salary_item.snils
-
-                if is_equal_year and is_equal_month and is_equal_snils:
-                    employee.salary.append(salary_item)
-    return periods
+        with open(part_file, mode='wb') as result:
+            stream = profiler.stream('write file', result) if profiler else result
+            writer = XMLStreamWriter(stream, indent=INDENT if pretty else None)
+            writer.start_document()
+            with writer.node('ЭДПФР', XML_NAMESPACES):
+                with writer.node('СИоЗП'):
+                    # Organization info
+                    _add_organization_node(writer, organization, salary_fund_data)
+                    # 1 part
+                    _add_salary_node(writer, chain([first_period], periods))
+                    if totals:
+                        # Salary found 2 part
+                        _add_salary_fond_node(writer, salary_fund_data)
+                        # 3 part
+                        _add_executive_salary_node(writer, executive_salary)
+                    # system info
+                    _add_system_node(writer, guid, created_at)
+    except BaseException:
+        if os.path.exists(part_file):
+            os.remove(part_file)
+        raise
+    os.replace(part_file, filename)
+
+
+def load_salary(ws: 'worksheet') -> Iterator[SalaryRecord]:
+    return _iter_models(Salary, ws, SALARY_MIN_ROW, validate_salary)
+
+
+def load_salary_fund(ws: 'worksheet') -> Iterator[SalaryFund]:
+    return _iter_models(SalaryFund, ws, SALARY_FUND_MIN_ROW)
+
+
+def load_executive_salaries(ws: 'worksheet') -> Iterator[ExecutiveSalary]:
+    return _iter_models(ExecutiveSalary, ws, EXECUTIVE_SALARY_MIN_ROW)
+
+
+def _create_employee(salary_rows: List[SalaryRecord]) -> Employee:
+    first_row = salary_rows[0]
+    employee = Employee(
+        snils=first_row.snils,
+        full_name=first_row.employee_name,
+        work_experience=first_row.work_experience,
+    )
+    employee.salary = salary_rows
+    return employee
+
+
+def create_period(year: int, month: int, employees_index: Dict[int, List[SalaryRecord]]) -> Period:
+    """Period with employees sorted by name from index snils -> [SalaryRecord]"""
+    period = Period(year=year, month=month)
+    employees = [_create_employee(salary_rows) for salary_rows in employees_index.values()]
+    period.employee = sorted(employees, key=lambda employee: employee.full_name)
+    return period
+
+
+SalaryIndex = Dict[Tuple[int, int], Dict[int, List[SalaryRecord]]]
+
+
+def index_salary_data(salary_data: Iterable[SalaryRecord]) -> SalaryIndex:
+    """Index (year, month) -> snils -> [SalaryRecord] in one pass, rows keep their original order"""
+    index: SalaryIndex = {}
+    for salary_item in salary_data:
+        period_index = index.setdefault((salary_item.year, salary_item.month), {})
+        period_index.setdefault(salary_item.snils, []).append(salary_item)
+    return index
+
+
+def create_group_by_period_salary_data(salary_data: Iterable[SalaryRecord]) -> List[Period]:
+    """
+    Group salary rows by period and employee in one pass.
+    Periods sorted by year and month, employees in period sorted by name.
+    """
+    index = index_salary_data(salary_data)
+    return [create_period(year, month, employees_index) for (year, month), employees_index in sorted(index.items())]
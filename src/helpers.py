@@ -1,18 +1,61 @@
-from typing import List
+from functools import lru_cache
+from typing import List, Tuple
 
-from dateparser import DateDataParser
+# distinct names and experience values, converted once
+VALUE_CACHE_SIZE = 65536
+
+# nominative, genitive, prepositional, dative, instrumental and abbreviations
+MONTH_FORMS = (
+    ('январь', 'января', 'январе', 'январю', 'январем', 'янв'),
+    ('февраль', 'февраля', 'феврале', 'февралю', 'февралем', 'фев', 'февр'),
+    ('март', 'марта', 'марте', 'марту', 'мартом', 'мар'),
+    ('апрель', 'апреля', 'апреле', 'апрелю', 'апрелем', 'апр'),
+    ('май', 'мая', 'мае', 'маю', 'маем'),
+    ('июнь', 'июня', 'июне', 'июню', 'июнем', 'июн'),
+    ('июль', 'июля', 'июле', 'июлю', 'июлем', 'июл'),
+    ('август', 'августа', 'августе', 'августу', 'августом', 'авг'),
+    ('сентябрь', 'сентября', 'сентябре', 'сентябрю', 'сентябрем', 'сен', 'сент'),
+    ('октябрь', 'октября', 'октябре', 'октябрю', 'октябрем', 'окт'),
+    ('ноябрь', 'ноября', 'ноябре', 'ноябрю', 'ноябрем', 'ноя', 'нояб'),
+    ('декабрь', 'декабря', 'декабре', 'декабрю', 'декабрем', 'дек'),
+)
+MONTH_NUMBERS = {form: number for number, forms in enumerate(MONTH_FORMS, start=1) for form in forms}
+
+
+@lru_cache(maxsize=None)
+def _get_date_parser():
+    from dateparser import DateDataParser
+
+    return DateDataParser(languages=['ru'])
+
+
+def prepare_date_parser() -> None:
+    """Build date parser for unknown month names in advance, e.g. in worker process before first report"""
+    _get_date_parser()
+
+
+@lru_cache(maxsize=128)
+def _parse_month_name(name: str) -> int:
+    date_data = _get_date_parser().get_date_data(f'1 {name}')
+    if date_data.date_obj is None:
+        raise ValueError(f'Неизвестный месяц: {name}')
+    return date_data.date_obj.month
 
 
 def get_mount_number(name: str) -> int:
     """
     Get month number by name
-    Use `dateparser` for cross-platform solution. Develop on Mac os, use on Windows
+    Known russian names look up in `MONTH_NUMBERS`, case and trailing dot ignored.
+    Unknown spellings parse with `dateparser` for cross-platform solution. Develop on Mac os, use on Windows
     Because native solution have different name in module calendar, for example
     on Windows `Январь` on Mac Os `января`
     """
-    ddp = DateDataParser(languages=['ru'])
-    date_data = ddp.get_date_data(f'1 {name}')
-    return date_data.date_obj.month
+    if not isinstance(name, str):
+        raise TypeError(f'Месяц должен быть названием или номером: {name!r}')
+    key = name.strip().lower().rstrip('.').replace('ё', 'е')
+    if key.isdigit():
+        return int(key)
+    return MONTH_NUMBERS.get(key) or _parse_month_name(name)
 
 
 def is_value_len(length) -> bool:
@@ -21,21 +64,29 @@ def is_value_len(length) -> bool:
     return False
 
 
+@lru_cache(maxsize=VALUE_CACHE_SIZE)
 def convert_experience(value: str) -> str:
     """
     Convert input value `XX лет XX мес` to `XX.XX`.
     Not check month value less 12.
     """
+    if not isinstance(value, str):
+        raise TypeError(f'Стаж должен быть в формате "XX лет XX мес": {value!r}')
     replaced_value: str = value.replace('лет', '.').replace('мес', '').replace(' ', '')
     years, months = replaced_value.split('.')
     return f'{years.zfill(2)}.{months.zfill(2)}'
 
 
-def decompose_full_name(full_name: str) -> List[str]:
+@lru_cache(maxsize=VALUE_CACHE_SIZE)
+def _split_full_name(full_name: str) -> Tuple[str, ...]:
     result = full_name.split(' ')
     if len(result) == 4:
-        return [result[0], result[1], f'{result[2]} {result[3]}']
+        return result[0], result[1], f'{result[2]} {result[3]}'
     if len(result) == 2:
-        result.append('')
-        return result
-    return result
+        return result[0], result[1], ''
+    return tuple(result)
+
+
+def decompose_full_name(full_name: str) -> List[str]:
+    """Last, first and middle name, split once for each distinct full name"""
+    return list(_split_full_name(full_name))
@@ -0,0 +1,324 @@
+"""
+Compact binary file with validated and grouped report between parse and xml generation.
+
+Layout: magic, length of json header, header, aligned data sections.
+Tables of periods, employees and salary rows stored by columns as arrays,
+strings in one table of utf-8 values, referenced by index.
+Reader maps file to memory and builds periods one at a time.
+"""
+import json
+import mmap
+import os
+import struct
+import uuid
+from array import array
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from loguru import logger
+
+from src.cache import SheetCache
+from src.converter import create_xml_file_name, load_report
+from src.handlers import create_xml_file
+from src.models import Employee, ExecutiveSalary, Period, SalaryFund
+from src.records import SalaryRecord
+
+MAGIC = b'SIOZP\x00'
+VERSION = 1
+INTERMEDIATE_EXTENSION = '.siozp'
+ALIGNMENT = 8
+
+EMPLOYEE_FIELDS = ('snils', 'full_name', 'work_experience', 'first_name', 'middle_name', 'last_name')
+# kinds of column: all int, all float, all str, mixed types (type tags and float payload)
+INT, FLOAT, STR, MIXED = 'i', 'f', 's', 'm'
+TAG_NONE, TAG_INT, TAG_FLOAT, TAG_STR = 0, 1, 2, 3
+TAGS = {type(None): TAG_NONE, int: TAG_INT, float: TAG_FLOAT, str: TAG_STR}
+
+
+class IntermediateFormatError(ValueError):
+    """File is not intermediate report or written by other version"""
+
+
+class _StringTable:
+    def __init__(self):
+        self.index: Dict[str, int] = {}
+
+    def add(self, value: str) -> int:
+        return self.index.setdefault(value, len(self.index))
+
+
+class _Writer:
+    """Data sections of file, offsets relative to start of data"""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.size = 0
+
+    def add(self, data: array) -> Dict[str, Any]:
+        raw = data.tobytes()
+        section = {'offset': self.size, 'typecode': data.typecode, 'length': len(data)}
+        padding = -len(raw) % ALIGNMENT
+        self.chunks.append(raw + b'\x00' * padding)
+        self.size += len(raw) + padding
+        return section
+
+
+def _column_kind(values: List[Any]) -> str:
+    types = {type(value) for value in values}
+    if types == {int}:
+        return INT
+    if types == {float}:
+        return FLOAT
+    if types == {str}:
+        return STR
+    unknown = types - set(TAGS)
+    if unknown:
+        raise TypeError(f'Value of type {unknown.pop().__name__} can not be stored')
+    return MIXED
+
+
+def _write_column(writer: _Writer, strings: _StringTable, values: List[Any]) -> Dict[str, Any]:
+    kind = _column_kind(values)
+    if kind == INT:
+        return {'kind': kind, 'values': writer.add(array('q', values))}
+    if kind == FLOAT:
+        return {'kind': kind, 'values': writer.add(array('d', values))}
+    if kind == STR:
+        return {'kind': kind, 'values': writer.add(array('q', [strings.add(value) for value in values]))}
+    tags = array('B', [TAGS[type(value)] for value in values])
+    payload = array('d', [
+        strings.add(value) if type(value) is str else float(value or 0)
+        for value in values
+    ])
+    return {'kind': kind, 'tags': writer.add(tags), 'values': writer.add(payload)}
+
+
+def _write_table(writer: _Writer, strings: _StringTable, rows: List[Any], fields: Iterable[str]) -> Dict[str, Any]:
+    return {name: _write_column(writer, strings, [getattr(row, name) for row in rows]) for name in fields}
+
+
+def write_intermediate(
+        filename: str,
+        periods: List[Period],
+        salary_fund_data: List[SalaryFund],
+        executive_salary: List[ExecutiveSalary],
+) -> None:
+    """Write grouped report, order of periods, employees and rows same as in xml"""
+    employees = [employee for period in periods for employee in period.employee]
+    rows = [row for employee in employees for row in employee.salary]
+    employee_starts, row_starts = [0], [0]
+    for period in periods:
+        employee_starts.append(employee_starts[-1] + len(period.employee))
+    for employee in employees:
+        row_starts.append(row_starts[-1] + len(employee.salary))
+
+    writer, strings = _Writer(), _StringTable()
+    header = {
+        'version': VERSION,
+        'periods': {
+            'count': len(periods),
+            'employee_starts': writer.add(array('q', employee_starts)),
+            'columns': _write_table(writer, strings, periods, ('year', 'month')),
+        },
+        'employees': {
+            'count': len(employees),
+            'row_starts': writer.add(array('q', row_starts)),
+            'columns': _write_table(writer, strings, employees, EMPLOYEE_FIELDS),
+        },
+        'salary': {
+            'count': len(rows),
+            'columns': _write_table(writer, strings, rows, SalaryRecord.__slots__),
+        },
+        'salary_fund': [item.dict() for item in salary_fund_data],
+        'executive_salary': [item.dict() for item in executive_salary],
+    }
+    encoded = [value.encode('utf-8') for value in strings.index]
+    string_starts = [0]
+    for value in encoded:
+        string_starts.append(string_starts[-1] + len(value))
+    header['strings'] = {
+        'starts': writer.add(array('q', string_starts)),
+        'data': writer.add(array('B', b''.join(encoded))),
+    }
+
+    raw_header = json.dumps(header, ensure_ascii=False).encode('utf-8')
+    raw_header += b' ' * (-(len(MAGIC) + 4 + len(raw_header)) % ALIGNMENT)
+    with open(filename, mode='wb') as result:
+        result.write(MAGIC)
+        result.write(struct.pack('<I', len(raw_header)))
+        result.write(raw_header)
+        for chunk in writer.chunks:
+            result.write(chunk)
+
+
+class _Column:
+    def __init__(self, reader: 'IntermediateReader', spec: Dict[str, Any]):
+        self.reader = reader
+        self.kind = spec['kind']
+        self.values = reader._section(spec['values'])
+        self.tags = reader._section(spec['tags']) if self.kind == MIXED else None
+
+    def __getitem__(self, index: int) -> Any:
+        value = self.values[index]
+        if self.kind in (INT, FLOAT):
+            return value
+        if self.kind == STR:
+            return self.reader.string(value)
+        tag = self.tags[index]
+        if tag == TAG_NONE:
+            return None
+        if tag == TAG_INT:
+            return int(value)
+        if tag == TAG_STR:
+            return self.reader.string(int(value))
+        return value
+
+
+class IntermediateReader:
+    """Memory-mapped intermediate report, periods built on demand"""
+
+    def __init__(self, filename: str):
+        self._file = open(filename, mode='rb')
+        if os.fstat(self._file.fileno()).st_size < len(MAGIC) + 4:
+            # empty file can't be mapped
+            self._file.close()
+            raise IntermediateFormatError(f'Not intermediate report: {filename}')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+        # views of sections, released before file closed
+        self._sections: List[memoryview] = []
+        if bytes(self._view[:len(MAGIC)]) != MAGIC:
+            self.close()
+            raise IntermediateFormatError(f'Not intermediate report: {filename}')
+        (header_size,) = struct.unpack_from('<I', self._map, len(MAGIC))
+        self._data_offset = len(MAGIC) + 4 + header_size
+        try:
+            self.header = json.loads(bytes(self._view[len(MAGIC) + 4:self._data_offset]))
+        except ValueError:
+            self.close()
+            raise IntermediateFormatError(f'Damaged header of intermediate report: {filename}')
+        self.filename = filename
+        self._strings: Dict[int, str] = {}
+        try:
+            if self.header['version'] != VERSION:
+                raise IntermediateFormatError(f'Unsupported version {self.header["version"]}: {filename}')
+            self._string_starts = self._section(self.header['strings']['starts'])
+            self._string_data = self._section(self.header['strings']['data'])
+        except (KeyError, IntermediateFormatError) as e:
+            self.close()
+            if isinstance(e, KeyError):
+                raise self._missing_key(e) from e
+            raise
+
+    def _missing_key(self, error: KeyError) -> IntermediateFormatError:
+        return IntermediateFormatError(f'Damaged header of intermediate report, no key {error}: {self.filename}')
+
+    def _section(self, section: Dict[str, Any]) -> memoryview:
+        try:
+            start = self._data_offset + section['offset']
+            size = section['length'] * array(section['typecode']).itemsize
+        except KeyError as e:
+            raise self._missing_key(e) from e
+        if start + size > len(self._map):
+            raise IntermediateFormatError(f'Truncated intermediate report: {self.filename}')
+        view = self._view[start:start + size]
+        self._sections.append(view)
+        self._sections.append(view.cast(section['typecode']))
+        return self._sections[-1]
+
+    def string(self, index: int) -> str:
+        value = self._strings.get(index)
+        if value is None:
+            value = self._strings[index] = bytes(
+                self._string_data[self._string_starts[index]:self._string_starts[index + 1]]).decode('utf-8')
+        return value
+
+    def _columns(self, table: str) -> Dict[str, _Column]:
+        return {name: _Column(self, spec) for name, spec in self.header[table]['columns'].items()}
+
+    @property
+    def salary_fund_data(self) -> List[SalaryFund]:
+        try:
+            return [SalaryFund.construct(**values) for values in self.header['salary_fund']]
+        except KeyError as e:
+            raise self._missing_key(e) from e
+
+    @property
+    def executive_salary(self) -> List[ExecutiveSalary]:
+        try:
+            return [ExecutiveSalary.construct(**values) for values in self.header['executive_salary']]
+        except KeyError as e:
+            raise self._missing_key(e) from e
+
+    def periods(self) -> Iterator[Period]:
+        """Periods with employees and salary rows, one period in memory at a time"""
+        try:
+            period_columns = self._columns('periods')
+            employee_columns = self._columns('employees')
+            salary_columns = list(self._columns('salary').items())
+            employee_starts = self._section(self.header['periods']['employee_starts'])
+            row_starts = self._section(self.header['employees']['row_starts'])
+            period_count = self.header['periods']['count']
+        except KeyError as e:
+            raise self._missing_key(e) from e
+        for period_index in range(period_count):
+            employees = []
+            for employee_index in range(employee_starts[period_index], employee_starts[period_index + 1]):
+                rows = [
+                    SalaryRecord(**{name: column[row_index] for name, column in salary_columns})
+                    for row_index in range(row_starts[employee_index], row_starts[employee_index + 1])
+                ]
+                values = {name: column[employee_index] for name, column in employee_columns.items()}
+                employees.append(Employee.construct(**values, salary=rows))
+            yield Period.construct(
+                year=period_columns['year'][period_index],
+                month=period_columns['month'][period_index],
+                employee=employees,
+            )
+
+    def close(self) -> None:
+        for view in reversed(self._sections):
+            view.release()
+        self._view.release()
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> 'IntermediateReader':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+def parse_report(report_file: str, filename: str, cache: Optional[SheetCache] = None) -> str:
+    """Read and validate xlsx report, write grouped data to intermediate file"""
+    write_intermediate(filename, *load_report(report_file, cache))
+    logger.info(f'Complete parse report: {os.path.basename(filename)}')
+    return filename
+
+
+def render_report(
+        filename: str,
+        output_dir: str,
+        guid: Optional[str] = None,
+        created_at: Optional[datetime] = None,
+) -> Tuple[str, str]:
+    """
+    Write xml report from intermediate file without reading xlsx report
+    :param guid: str - GUID of report, by default new
+    :param created_at: datetime - date and time of report, by default now
+    :return: (path to xml file, guid)
+    """
+    guid = guid or str(uuid.uuid4())
+    xml_file = os.path.join(output_dir, create_xml_file_name(guid))
+    with IntermediateReader(filename) as reader:
+        create_xml_file(
+            xml_file,
+            reader.periods(),
+            reader.salary_fund_data,
+            reader.executive_salary,
+            guid,
+            created_at=created_at,
+        )
+    logger.info(f'Complete generate xml file: {os.path.basename(xml_file)}')
+    return xml_file, guid
@@ -1,7 +1,7 @@
 from enum import Enum
-from typing import List, Optional
+from functools import lru_cache
+from typing import Callable, List, Optional, Tuple
 
-from loguru import logger
 from pydantic import (
     BaseModel,
     Field,
@@ -10,9 +10,7 @@ from pydantic import (
 )
 
 from src.helpers import convert_experience, decompose_full_name, get_mount_number
-from src.settings import Settings
-
-settings = Settings()
+from src.settings import settings
 
 
 class IndexEnum(Enum):
@@ -57,11 +55,22 @@ class XMLBaseModel(BaseModel):
             return value
         return str(value) if type(value) == int else '%.2f' % value
 
-    def represent_to_xml(self):
+    @classmethod
+    @lru_cache(maxsize=None)
+    def xml_fields(cls, fields: Optional[Tuple[str, ...]] = None) -> Tuple[Tuple[str, str, Callable], ...]:
+        """
+        Ordered (attribute, xml tag, formatter) for fields, computed once per model class.
+        Without `fields` - all fields except `exclude_fields`.
+        """
+        names = fields or [key for key in cls.__fields__ if key not in cls.exclude_fields()]
+        return tuple(
+            (key, field.field_info.extra['name'], cls.display_value)
+            for key, field in cls.__fields__.items() if key in names
+        )
+
+    def represent_to_xml(self, fields: Optional[Tuple[str, ...]] = None) -> List[Tuple[str, str]]:
         """Represent for xml report.Exclude dont need fields"""
-        properties = self.schema()['properties']
-        return dict((properties[key]['name'], self.display_value(value)) for (key, value) in self.dict().items()
-                    if key not in self.exclude_fields()).items()
+        return [(tag, formatter(getattr(self, key))) for key, tag, formatter in self.xml_fields(fields)]
 
 
 class OrgBaseModel(XMLBaseModel):
@@ -110,7 +119,8 @@ class Salary(XMLBaseModel):
     compensation_payments_for_district_regulation: Optional[float] = Field(0, name='ВыплатыКомпенс')
     total_accruals: Optional[float] = Field(0, name='НачисленияИтого')
 
-    def exclude_fields(self) -> List[str]:
+    @staticmethod
+    def exclude_fields() -> List[str]:
         return ['inn', 'kpp', 'okfs', 'org_type', 'employee_name', 'snils', 'work_experience']
 
     @validator('month', pre=True)
@@ -122,8 +132,8 @@ class Salary(XMLBaseModel):
     @validator('staff_category_code')
     def check_code(cls, v):
         if v not in settings.allow_category_code:
-            logger.error(f'Error in staff category code: {v}.Allow values only {settings.allow_category_code}.')
-            raise ValueError('Проверьте категорию персонала')
+            # no logging here: row validated again by model when fast path fails, error logged by loader
+            raise ValueError(f'Проверьте категорию персонала: {v}, допустимые значения {settings.allow_category_code}')
         return v
 
     @validator('experience_for_additional_payments', pre=True)
@@ -148,12 +158,9 @@ class Salary(XMLBaseModel):
             return
         return AcademicDegree(v).index
 
-    def represent_organization_to_xml(self):
+    def represent_organization_to_xml(self) -> List[Tuple[str, str]]:
         """Represent for xml report for organization node"""
-        fields = ['inn', 'kpp', 'okfs', 'org_type']
-        properties = self.schema()['properties']
-        return dict((properties[key]['name'], self.display_value(value)) for (key, value) in self.dict().items()
-                    if key in fields).items()
+        return self.represent_to_xml(('inn', 'kpp', 'okfs', 'org_type'))
 
 
 class Employee(XMLBaseModel):
@@ -174,25 +181,23 @@ class Employee(XMLBaseModel):
         last_name, first_name, middle_name = decompose_full_name(full_name)
         return {'first_name': first_name, 'last_name': last_name, 'middle_name': middle_name, **values}
 
-    def represent_name_to_xml(self):
+    def represent_name_to_xml(self) -> List[Tuple[str, str]]:
         """Represent for xml report"""
-        properties = self.schema()['properties']
-        fields = ('last_name', 'first_name', 'middle_name')
-        return dict((properties[key]['name'], self.display_value(value)) for (key, value) in self.dict().items()
-                    if key in fields).items()
+        return self.represent_to_xml(('last_name', 'first_name', 'middle_name'))
 
 
 class Period(XMLBaseModel):
     """
     Period for group data.
-    Note: To group by organization, you need to use another level.
-    We make an assumption - one report file-one organization.
+    Note: Periods of one organization, report with several organizations
+    converted to file for each organization (src.organizations).
     """
     year: int = Field(name='Год')
     month: int = Field(name='Месяц')
-    employee: Optional[Employee]
+    employee: Optional[List[Employee]]
 
-    def exclude_fields(self) -> List[str]:
+    @staticmethod
+    def exclude_fields() -> List[str]:
         return ['employee']
 
 
@@ -210,15 +215,13 @@ class SalaryFund(OrgBaseModel):
     other_budget_total: Optional[float] = Field(name='РасхОбщОМС')
     other_budget_category: Optional[float] = Field(name='РасхКатОМС')
 
-    def exclude_fields(self) -> List[str]:
+    @staticmethod
+    def exclude_fields() -> List[str]:
         return ['inn', 'kpp', 'okogu']
 
-    def represent_organization_to_xml(self):
+    def represent_organization_to_xml(self) -> List[Tuple[str, str]]:
         """Represent for xml report for organization node"""
-        fields = ['okogu']
-        properties = self.schema()['properties']
-        return dict((properties[key]['name'], self.display_value(value)) for (key, value) in self.dict().items()
-                    if key in fields).items()
+        return self.represent_to_xml(('okogu',))
 
 
 class ExecutiveSalary(OrgBaseModel):
@@ -230,5 +233,6 @@ class ExecutiveSalary(OrgBaseModel):
     average_salary_of_chief_accountant: Optional[float] = Field(name='СредЗПГлБух')
     average_salary_of_employees: Optional[float] = Field(name='РасхОбщФед')
 
-    def exclude_fields(self) -> List[str]:
+    @staticmethod
+    def exclude_fields() -> List[str]:
         return ['inn', 'kpp']
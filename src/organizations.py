@@ -0,0 +1,131 @@
+import os
+import pickle
+import tempfile
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, BinaryIO, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from loguru import logger
+
+from src.converter import SHEETS, create_xml_file_name, report_sources
+from src.handlers import create_group_by_period_salary_data, create_xml_file
+
+OrganizationKey = Tuple[int, int]
+
+
+class OrganizationResult(NamedTuple):
+    inn: int
+    kpp: int
+    xml_file: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def success(self) -> bool:
+        return self.error is None
+
+    @property
+    def name(self) -> str:
+        return organization_name((self.inn, self.kpp))
+
+
+def organization_key(row: Any) -> OrganizationKey:
+    """(inn, kpp) of row from any sheet, inn and kpp of first sheet are strings"""
+    return int(row.inn), int(row.kpp)
+
+
+def organization_name(key: OrganizationKey) -> str:
+    inn, kpp = key
+    return f'ИНН {inn:010d} КПП {kpp:09d}'
+
+
+def partition_report(report_file: str, work_dir: str) -> Dict[OrganizationKey, Dict[str, str]]:
+    """
+    Read and validate report once, rows of each sheet written to separate file for each organization.
+    Sheet cache not used: it keeps all rows of sheet in memory.
+    :param work_dir: str - folder for files with rows
+    :return: dict (inn, kpp) -> sheet name -> file with pickled rows
+    """
+    parts: Dict[OrganizationKey, Dict[str, str]] = {}
+    files: Dict[str, BinaryIO] = {}
+    try:
+        with report_sources(report_file) as sources:
+            for index, (name, _, _) in enumerate(SHEETS):
+                for row in sources[name]:
+                    key = organization_key(row)
+                    sheets = parts.setdefault(key, {})
+                    if name not in sheets:
+                        sheets[name] = os.path.join(work_dir, f'{key[0]}_{key[1]}_{index}.pickle')
+                        files[sheets[name]] = open(sheets[name], mode='wb')
+                    pickle.dump(row, files[sheets[name]], protocol=pickle.HIGHEST_PROTOCOL)
+    finally:
+        for part in files.values():
+            part.close()
+    return parts
+
+
+def _iter_part(filename: Optional[str]) -> Iterator:
+    if filename is None:
+        return
+    with open(filename, mode='rb') as part:
+        while True:
+            try:
+                yield pickle.load(part)
+            except EOFError:
+                return
+
+
+def convert_organization(key: OrganizationKey, sheets: Dict[str, str], output_dir: str) -> OrganizationResult:
+    """Group rows of one organization and write its xml report, error reported in result"""
+    name = organization_name(key)
+    try:
+        missing = [sheet for sheet, _, _ in SHEETS if sheet not in sheets]
+        if missing:
+            raise ValueError(f'Нет строк организации в листах: {", ".join(missing)}')
+        guid = str(uuid.uuid4())
+        xml_file = os.path.join(output_dir, create_xml_file_name(guid))
+        create_xml_file(
+            xml_file,
+            create_group_by_period_salary_data(_iter_part(sheets['Раздел 1'])),
+            list(_iter_part(sheets['Раздел 2'])),
+            list(_iter_part(sheets['Раздел 3'])),
+            guid,
+        )
+    except Exception as e:
+        logger.exception(f'Error convert organization: {name}')
+        return OrganizationResult(*key, error=f'{type(e).__name__}: {e}')
+    logger.info(f'Complete generate xml file for {name}: {os.path.basename(xml_file)}')
+    return OrganizationResult(*key, xml_file=xml_file)
+
+
+def convert_report_by_organization(
+        report_file: str,
+        output_dir: str,
+        workers: Optional[int] = None,
+) -> List[OrganizationResult]:
+    """
+    Convert report with several organizations to xml file for each organization (inn, kpp).
+    Rows split by organization in one pass, each organization grouped and written in separate process,
+    so memory depends on the largest organization, not on whole report.
+    :param workers: int - number of processes, by default number of processors
+    :return: list of results in order of organizations
+    """
+    with tempfile.TemporaryDirectory(prefix='report-organizations-') as work_dir:
+        parts = partition_report(report_file, work_dir)
+        logger.info(f'Organizations in report: {len(parts)}')
+        with ProcessPoolExecutor(max_workers=workers or None) as executor:
+            futures = {
+                executor.submit(convert_organization, key, sheets, output_dir): key
+                for key, sheets in parts.items()
+            }
+            results = {futures[future]: future.result() for future in as_completed(futures)}
+    return [results[key] for key in sorted(results)]
+
+
+def log_summary(results: List[OrganizationResult]) -> None:
+    for result in results:
+        if result.success:
+            logger.info(f'OK    {result.name} -> {os.path.basename(result.xml_file)}')
+        else:
+            logger.error(f'FAIL  {result.name}: {result.error}')
+    failed = sum(not result.success for result in results)
+    logger.info(f'Converted {len(results) - failed} of {len(results)} organizations, failed: {failed}')
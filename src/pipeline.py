@@ -0,0 +1,157 @@
+import os
+import queue
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator
+
+from loguru import logger
+
+from src.converter import SHEETS, convert_report, create_xml_file_name, open_workbook
+from src.handlers import create_period, create_xml_file
+from src.models import Period
+from src.records import SalaryRecord
+
+# max number of validated rows waiting in queue of each sheet
+QUEUE_SIZE = 1000
+# max number of grouped periods waiting for writing
+PERIOD_QUEUE_SIZE = 2
+# seconds between checks of stop event while queue is full or empty
+POLL_INTERVAL = 0.1
+
+_END = object()
+
+
+class UnorderedPeriodsError(Exception):
+    """Rows of first sheet not sorted by period, periods can't be written before end of sheet"""
+
+
+class _Failure:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class _Stopped(Exception):
+    """Pipeline stopped by another stage"""
+
+
+def _put(items: queue.Queue, item: Any, stop: threading.Event) -> None:
+    while not stop.is_set():
+        try:
+            items.put(item, timeout=POLL_INTERVAL)
+            return
+        except queue.Full:
+            continue
+    raise _Stopped
+
+
+def _iter_queue(items: queue.Queue, stop: threading.Event) -> Iterator:
+    while True:
+        try:
+            item = items.get(timeout=POLL_INTERVAL)
+        except queue.Empty:
+            if stop.is_set():
+                raise _Stopped
+            continue
+        if item is _END:
+            return
+        if isinstance(item, _Failure):
+            raise item.error
+        yield item
+
+
+def _load_sheet(report_file: str, name: str, loader: Callable, items: queue.Queue, stop: threading.Event) -> None:
+    """Load sheet from own workbook handle into queue, error passed to consumer"""
+    wb = None
+    try:
+        wb = open_workbook(report_file)
+        for row in loader(wb[name]):
+            _put(items, row, stop)
+        _put(items, _END, stop)
+    except _Stopped:
+        pass
+    except Exception as error:
+        try:
+            _put(items, _Failure(error), stop)
+        except _Stopped:
+            pass
+    finally:
+        if wb is not None:
+            wb.close()
+
+
+def iter_periods(rows: Iterable[SalaryRecord]) -> Iterator[Period]:
+    """
+    Periods from rows sorted by period, each period yielded as soon as rows of next period started.
+    Same periods as `create_group_by_period_salary_data`, raise UnorderedPeriodsError for unsorted rows.
+    """
+    current, index = None, {}
+    for row in rows:
+        key = (row.year, row.month)
+        if key != current:
+            if current is not None:
+                if key < current:
+                    raise UnorderedPeriodsError(f'Period {key} after {current}')
+                yield create_period(*current, index)
+            current, index = key, {}
+        index.setdefault(row.snils, []).append(row)
+    if current is not None:
+        yield create_period(*current, index)
+
+
+def _write_xml(xml_file: str, periods: queue.Queue, others: Dict[str, Any], guid: str, stop: threading.Event) -> None:
+    try:
+        create_xml_file(
+            xml_file,
+            _iter_queue(periods, stop),
+            others['Раздел 2'].result(),
+            others['Раздел 3'].result(),
+            guid,
+        )
+    except BaseException:
+        stop.set()
+        raise
+
+
+def convert_report_pipelined(report_file: str, output_dir: str) -> str:
+    """
+    Convert report with overlapped stages: sheets loaded at the same time from own workbook handles,
+    period written to xml while next periods validated. Stages connected by bounded queues.
+    Output is identical to `convert_report`, for rows of first sheet not sorted by period
+    conversion restarted sequentially.
+    :param report_file: str - path to xlsx report
+    :param output_dir: str - folder for xml file
+    :return: str - path to created xml file
+    """
+    guid: str = str(uuid.uuid4())
+    xml_file = os.path.join(output_dir, create_xml_file_name(guid))
+    stop = threading.Event()
+    queues: Dict[str, queue.Queue] = {name: queue.Queue(QUEUE_SIZE) for name, _, _ in SHEETS}
+    periods: queue.Queue = queue.Queue(PERIOD_QUEUE_SIZE)
+    logger.info(f'Read file: {report_file} (pipeline)')
+    try:
+        with ThreadPoolExecutor(max_workers=len(SHEETS) + 3, thread_name_prefix='pipeline') as executor:
+            for name, _, loader in SHEETS:
+                executor.submit(_load_sheet, report_file, name, loader, queues[name], stop)
+            others = {
+                name: executor.submit(lambda items: list(_iter_queue(items, stop)), queues[name])
+                for name, _, _ in SHEETS[1:]
+            }
+            writer = executor.submit(_write_xml, xml_file, periods, others, guid, stop)
+            try:
+                for period in iter_periods(_iter_queue(queues['Раздел 1'], stop)):
+                    _put(periods, period, stop)
+                _put(periods, _END, stop)
+                writer.result()
+            except _Stopped:
+                # stopped by failed writer, raise its error
+                writer.result()
+                raise
+            except BaseException:
+                stop.set()
+                raise
+    except UnorderedPeriodsError as error:
+        logger.warning(f'Rows of sheet "Раздел 1" not sorted by period ({error}), convert sequentially')
+        return convert_report(report_file, output_dir)
+    logger.info(f'Complete generate xml file: {os.path.basename(xml_file)}')
+    return xml_file
@@ -0,0 +1,153 @@
+import json
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional
+
+from loguru import logger
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def process_peak_rss() -> Optional[float]:
+    """
+    Peak resident memory of process since its start in Mb, None if not available on platform.
+    It is high-water mark of whole process, not memory of one stage.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on Mac os, kilobytes on Linux
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+
+class Stage:
+    def __init__(self, name: str):
+        self.name = name
+        self.seconds = 0.0
+        self.rows: Optional[int] = None
+        # peak memory of process at the end of stage, includes earlier stages and files of worker
+        self.process_peak_rss: Optional[float] = None
+        # time of nested stages, not included in own time
+        self.nested_seconds = 0.0
+
+    def dict(self) -> Dict[str, Any]:
+        return {
+            'stage': self.name,
+            'seconds': round(self.seconds, 6),
+            'rows': self.rows,
+            'process_peak_rss_mb': self.process_peak_rss,
+        }
+
+
+class Profiler:
+    """
+    Wall time, number of rows and peak resident memory of process after stages of conversion.
+    Memory is high-water mark of process (ru_maxrss): it only grows, so stage shows peak of process
+    up to its end, in batch mode also peaks of files converted before by the same worker.
+    Time of nested stages (iterator of loader consumed in grouping) not included in time of outer stage.
+    Disabled profiler only call code without measurements.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.stages: List[Stage] = []
+        self._active: List[Stage] = []
+
+    def _get_stage(self, name: str) -> Stage:
+        for stage in self.stages:
+            if stage.name == name:
+                return stage
+        stage = Stage(name)
+        self.stages.append(stage)
+        return stage
+
+    def _add_time(self, stage: Stage, seconds: float) -> None:
+        stage.seconds += seconds
+        for parent in self._active:
+            if parent is not stage:
+                parent.nested_seconds += seconds
+        stage.process_peak_rss = process_peak_rss()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[Stage]:
+        stage = self._get_stage(name)
+        if not self.enabled:
+            yield stage
+            return
+        parents = list(self._active)
+        self._active.append(stage)
+        nested_before = stage.nested_seconds
+        start = time.perf_counter()
+        try:
+            yield stage
+        finally:
+            self._active.pop()
+            elapsed = time.perf_counter() - start - (stage.nested_seconds - nested_before)
+            stage.seconds += elapsed
+            for parent in parents:
+                parent.nested_seconds += elapsed
+            stage.process_peak_rss = process_peak_rss()
+
+    def iterate(self, name: str, iterable: Iterable) -> Iterator:
+        """Iterate with time of getting items and number of items as separate stage"""
+        if not self.enabled:
+            return iter(iterable)
+        return self._iterate(self._get_stage(name), iter(iterable))
+
+    def _iterate(self, stage: Stage, iterator: Iterator) -> Iterator:
+        stage.rows = stage.rows or 0
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self._add_time(stage, time.perf_counter() - start)
+                return
+            self._add_time(stage, time.perf_counter() - start)
+            stage.rows += 1
+            yield item
+
+    def stream(self, name: str, stream: BinaryIO) -> BinaryIO:
+        """File object with time of writes as separate stage"""
+        if not self.enabled:
+            return stream
+        return _TimedStream(self, self._get_stage(name), stream)
+
+    def dict(self) -> List[Dict[str, Any]]:
+        return [stage.dict() for stage in self.stages]
+
+    def log_summary(self, title: str = '') -> None:
+        if not self.enabled:
+            return
+        lines = [f'{"Stage":<36}{"Time, s":>10}{"Rows":>10}{"Process peak RSS, Mb":>23}']
+        for stage in self.stages:
+            rows = '' if stage.rows is None else str(stage.rows)
+            rss = '' if stage.process_peak_rss is None else f'{stage.process_peak_rss:.1f}'
+            lines.append(f'{stage.name:<36}{stage.seconds:>10.3f}{rows:>10}{rss:>23}')
+        lines.append(f'{"Total":<36}{sum(stage.seconds for stage in self.stages):>10.3f}')
+        logger.info(f'Profile {title}\n' + '\n'.join(lines))
+
+    def write_json(self, filename: str, **extra) -> None:
+        with open(filename, mode='w', encoding='utf-8') as result:
+            json.dump({**extra, 'stages': self.dict()}, result, ensure_ascii=False, indent=4)
+
+
+class _TimedStream:
+
+    def __init__(self, profiler: Profiler, stage: Stage, stream: BinaryIO):
+        self._profiler = profiler
+        self._stage = stage
+        self._stream = stream
+
+    def write(self, data: bytes) -> int:
+        start = time.perf_counter()
+        result = self._stream.write(data)
+        self._profiler._add_time(self._stage, time.perf_counter() - start)
+        return result
+
+    def __getattr__(self, name: str):
+        return getattr(self._stream, name)
@@ -0,0 +1,207 @@
+from inspect import signature
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pydantic.class_validators import Validator
+from pydantic.fields import ModelField
+
+from src.models import Salary
+
+
+class FastPathError(Exception):
+    """Value not handled by compiled validation, model validate it"""
+
+
+class ModelRecord:
+    """
+    Plain record with validated values of model fields.
+    Same interface as model for grouping and xml report, model created only on demand by `to_model`.
+    """
+    __slots__ = ()
+    model = None
+
+    def __init__(self, **values):
+        for key in self.__slots__:
+            setattr(self, key, values[key])
+
+    @classmethod
+    def from_model(cls, model):
+        return cls(**{key: getattr(model, key) for key in cls.__slots__})
+
+    def to_model(self):
+        return self.model.construct(**self.dict())
+
+    def dict(self) -> Dict[str, Any]:
+        return {key: getattr(self, key) for key in self.__slots__}
+
+    def represent_to_xml(self, fields: Optional[Tuple[str, ...]] = None) -> List[Tuple[str, str]]:
+        return [(tag, formatter(getattr(self, key))) for key, tag, formatter in self.model.xml_fields(fields)]
+
+    def __eq__(self, other):
+        if isinstance(other, ModelRecord):
+            return self.model is other.model and self.dict() == other.dict()
+        return NotImplemented
+
+    def __repr__(self):
+        values = ', '.join(f'{key}={getattr(self, key)!r}' for key in self.__slots__)
+        return f'{self.__class__.__name__}({values})'
+
+
+class SalaryRecord(ModelRecord):
+    """Row from report in first sheet"""
+    __slots__ = tuple(Salary.__fields__)
+    model = Salary
+
+    def represent_organization_to_xml(self) -> List[Tuple[str, str]]:
+        return self.represent_to_xml(('inn', 'kpp', 'okfs', 'org_type'))
+
+
+class StringStore:
+    """
+    Dictionary of distinct strings: equal values of rows (inn, kpp, names, positions) share one object.
+    Cleared when grows over `max_size`, objects already shared stay in rows.
+    """
+
+    def __init__(self, max_size: int = 1_000_000):
+        self.max_size = max_size
+        self._values: Dict[str, str] = {}
+
+    def __call__(self, value: str) -> str:
+        try:
+            return self._values[value]
+        except KeyError:
+            if len(self._values) >= self.max_size:
+                self._values.clear()
+            self._values[value] = value
+            return value
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+
+strings = StringStore()
+
+INT_COERCE = """
+    if type(value) is not int:
+        if type(value) is float and value.is_integer():
+            value = int(value)
+        else:
+            raise FastPathError"""
+FLOAT_COERCE = """
+    if type(value) is int or type(value) is float:
+        value = float(value)
+    else:
+        raise FastPathError"""
+STR_COERCE = """
+    if type(value) is not str:
+        if type(value) is int or type(value) is float:
+            value = str(value)
+        else:
+            raise FastPathError
+    value = strings(value)"""
+
+
+# constraints checked only by model, rows of fields with them always validated by model
+MODEL_CONSTRAINTS = ('const', 'multiple_of', 'max_digits', 'decimal_places', 'min_items', 'max_items',
+                     'unique_items', 'regex')
+
+
+def _field_checks(field: ModelField) -> Optional[List[str]]:
+    """Checks of constraints for compiled function, None if field has constraints checked only by model"""
+    info = field.field_info
+    if any(getattr(info, name) is not None for name in MODEL_CONSTRAINTS):
+        return None
+    checks = []
+    if info.gt is not None:
+        checks.append(f'value > {info.gt!r}')
+    if info.ge is not None:
+        checks.append(f'value >= {info.ge!r}')
+    if info.lt is not None:
+        checks.append(f'value < {info.lt!r}')
+    if info.le is not None:
+        checks.append(f'value <= {info.le!r}')
+    if info.min_length is not None:
+        checks.append(f'len(value) >= {info.min_length!r}')
+    if info.max_length is not None:
+        checks.append(f'len(value) <= {info.max_length!r}')
+    return checks
+
+
+def _is_simple_validator(validator: Validator) -> bool:
+    """Validator called by compiled function: for whole value, with arguments (cls, value) only"""
+    return not validator.each_item and len(signature(validator.func).parameters) == 2
+
+
+class RowValidator:
+    """
+    Compiled validation of rows for record class.
+    Generate one function with the same checks as model: type, ge/le, length, pre and post validators of model.
+    Row with value out of fast path (error or unusual type) validated by model itself,
+    so errors are identical with model errors. Fields with other constraints or validators
+    with `values`/`field`/`config` arguments not compiled, their rows always validated by model.
+    """
+
+    def __init__(self, record_class):
+        self.record_class = record_class
+        self.model = record_class.model
+        self.fields = list(self.model.__fields__)
+        self._validate = self._compile()
+
+    def _compile_field(self, index: int, field: ModelField, namespace: Dict[str, Any]) -> str:
+        # validators of field in order of model: own, then '*'
+        validators = list(field.class_validators.values())
+        checks = _field_checks(field)
+        if checks is None or not all(_is_simple_validator(validator) for validator in validators):
+            return '    raise FastPathError'
+        lines = [f'    value = values[{field.name!r}]']
+        for number, validator in enumerate(validators):
+            namespace[f'validator_{index}_{number}'] = validator.func
+        pre = [f'validator_{index}_{number}' for number, validator in enumerate(validators) if validator.pre]
+        post = [f'validator_{index}_{number}' for number, validator in enumerate(validators) if not validator.pre]
+        lines.extend(f'    value = {name}(model, value)' for name in pre)
+        if issubclass(field.type_, str):
+            coerce = STR_COERCE
+        elif issubclass(field.type_, int):
+            coerce = INT_COERCE
+        else:
+            coerce = FLOAT_COERCE
+        if field.allow_none:
+            lines.append('    if value is not None:')
+            coerce = coerce.replace('\n', '\n    ')
+        else:
+            lines.append('    if value is None:\n        raise FastPathError')
+        lines.append(coerce.lstrip('\n'))
+        if checks:
+            indent = '        ' if field.allow_none else '    '
+            lines.append(f'{indent}if not ({" and ".join(checks)}):\n{indent}    raise FastPathError')
+        lines.extend(f'    value = {name}(model, value)' for name in post)
+        lines.append(f'    record.{field.name} = value')
+        return '\n'.join(lines)
+
+    def _compile(self) -> Callable[[Dict[str, Any]], Any]:
+        namespace = {
+            'FastPathError': FastPathError,
+            'model': self.model,
+            'record_class': self.record_class,
+            'strings': strings,
+        }
+        body = [
+            self._compile_field(index, field, namespace)
+            for index, field in enumerate(self.model.__fields__.values())
+        ]
+        source = '\n'.join([
+            'def validate(values):',
+            '    record = object.__new__(record_class)',
+            *body,
+            '    return record',
+        ])
+        exec(compile(source, f'<{self.record_class.__name__} validator>', 'exec'), namespace)
+        return namespace['validate']
+
+    def __call__(self, values: Dict[str, Any]):
+        try:
+            return self._validate(values)
+        except (FastPathError, ValueError, TypeError, KeyError, AttributeError):
+            return self.record_class.from_model(self.model(**values))
+
+
+validate_salary = RowValidator(SalaryRecord)
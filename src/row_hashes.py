@@ -0,0 +1,91 @@
+"""
+Hashes of raw salary rows by period and employee.
+Stored next to each created xml file in `<xml>.hashes` with digest of xml content,
+so `--delta` compares corrected report with previous xml without writing employees to xml.
+"""
+import hashlib
+import json
+import mmap
+from operator import attrgetter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.models import Period
+from src.records import SalaryRecord
+
+PeriodKey = Tuple[int, int]
+# employees of period in order of xml: (snils, hash of salary rows)
+PeriodHashes = Tuple[Tuple[int, bytes], ...]
+ReportHashes = Dict[PeriodKey, PeriodHashes]
+
+HASHES_SUFFIX = '.hashes'
+# change when values of rows or their hash changed
+HASHES_VERSION = 1
+
+_row_values = attrgetter(*SalaryRecord.__slots__)
+
+
+def rows_hash(salary_rows: Iterable[SalaryRecord]) -> bytes:
+    """Hash of values of employee rows in their order"""
+    digest = hashlib.blake2b(digest_size=16)
+    for row in salary_rows:
+        digest.update(repr(_row_values(row)).encode('utf-8'))
+    return digest.digest()
+
+
+def index_hashes(employees_index: Dict[int, List[SalaryRecord]]) -> PeriodHashes:
+    """Hashes of employees from index snils -> [SalaryRecord], in order of `create_period`"""
+    employees = sorted(employees_index.items(), key=lambda item: item[1][0].employee_name)
+    return tuple((snils, rows_hash(salary_rows)) for snils, salary_rows in employees)
+
+
+def report_hashes(periods: Iterable[Period]) -> ReportHashes:
+    """Hashes of employees of grouped periods"""
+    return {
+        (period.year, period.month): tuple((employee.snils, rows_hash(employee.salary)) for employee in period.employee)
+        for period in periods
+    }
+
+
+def content_digest(data) -> str:
+    """Digest of xml file content, bytes or mmap"""
+    return hashlib.blake2b(data).hexdigest()
+
+
+def file_digest(filename: str) -> str:
+    with open(filename, mode='rb') as xml_file, mmap.mmap(xml_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        return content_digest(data)
+
+
+def hashes_file_name(xml_file: str) -> str:
+    return xml_file + HASHES_SUFFIX
+
+
+def store_hashes(xml_file: str, hashes: ReportHashes) -> str:
+    """Save hashes of rows written to `xml_file` next to it"""
+    content = {
+        'version': HASHES_VERSION,
+        'digest': file_digest(xml_file),
+        'periods': [
+            [year, month, [[snils, digest.hex()] for snils, digest in period_hashes]]
+            for (year, month), period_hashes in sorted(hashes.items())
+        ],
+    }
+    filename = hashes_file_name(xml_file)
+    with open(filename, mode='w', encoding='utf-8') as hashes_file:
+        json.dump(content, hashes_file, separators=(',', ':'))
+    return filename
+
+
+def load_hashes(xml_file: str, digest: str) -> Optional[ReportHashes]:
+    """Hashes of rows of xml file with content digest, None if not stored, damaged or xml file changed"""
+    try:
+        with open(hashes_file_name(xml_file), encoding='utf-8') as hashes_file:
+            content = json.load(hashes_file)
+        if content['version'] != HASHES_VERSION or content['digest'] != digest:
+            return None
+        return {
+            (year, month): tuple((snils, bytes.fromhex(value)) for snils, value in period_hashes)
+            for year, month, period_hashes in content['periods']
+        }
+    except (OSError, KeyError, TypeError, ValueError):
+        return None
@@ -0,0 +1,207 @@
+import json
+import os
+import threading
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+from loguru import logger
+
+from src import converter
+from src.cache import SheetCache
+from src.helpers import prepare_date_parser
+from src.settings import override_settings
+
+# settings, which can be changed for one job
+JOB_SETTINGS = ('code_to', 'reg_number')
+# finished jobs kept for status requests, older removed
+JOBS_HISTORY = 1000
+
+
+def warm_up() -> None:
+    """Initializer of worker process: import libraries and build date parser before first job"""
+    import openpyxl  # noqa: F401
+
+    prepare_date_parser()
+
+
+def _ready() -> bool:
+    return True
+
+
+def run_job(report_file: str, output_dir: str, overrides: Dict[str, str], cache: Optional[SheetCache] = None) -> str:
+    # worker process run one job at a time
+    with override_settings(**overrides):
+        try:
+            return converter.convert_report(report_file, output_dir, cache)
+        except Exception:
+            logger.exception(f'Error convert file: {report_file}')
+            raise
+
+
+class Job:
+    def __init__(self, report: str, output_dir: str, overrides: Dict[str, str], future: Future):
+        self.id = str(uuid.uuid4())
+        self.report = report
+        self.output_dir = output_dir
+        self.overrides = overrides
+        self.future = future
+        self.created_at = datetime.now()
+
+    @property
+    def status(self) -> str:
+        if not self.future.done():
+            return 'running' if self.future.running() else 'queued'
+        if self.future.cancelled():
+            return 'cancelled'
+        return 'failed' if self.future.exception() else 'done'
+
+    def dict(self) -> Dict[str, Any]:
+        status = self.status
+        error = self.future.exception() if status == 'failed' else None
+        return {
+            'id': self.id,
+            'status': status,
+            'report': self.report,
+            'output_dir': self.output_dir,
+            **self.overrides,
+            'created_at': self.created_at.isoformat(),
+            'xml_file': self.future.result() if status == 'done' else None,
+            'error': f'{type(error).__name__}: {error}' if error else None,
+        }
+
+
+class ConversionService:
+    """
+    Queue of conversion jobs for warm worker processes.
+    Libraries imported and models built once for each worker, job pays only conversion itself.
+    """
+
+    def __init__(self, base_dir: str, output_dir: str, workers: Optional[int] = None,
+                 cache: Optional[SheetCache] = None):
+        self.base_dir = base_dir
+        self.output_dir = output_dir
+        self.workers = workers or os.cpu_count() or 1
+        self.cache = cache
+        self.jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=warm_up)
+
+    def start(self) -> None:
+        """Start all worker processes before first job"""
+        wait([self._executor.submit(_ready) for _ in range(self.workers)])
+        logger.info(f'Conversion service started with {self.workers} workers')
+
+    def submit(self, report: str, output_dir: Optional[str] = None, **overrides) -> Job:
+        """
+        Add conversion job, relative paths from base folder of service
+        :param overrides: settings for job, only `JOB_SETTINGS`
+        """
+        unknown = set(overrides) - set(JOB_SETTINGS)
+        if unknown:
+            raise ValueError(f'Unknown settings: {", ".join(sorted(unknown))}')
+        report = self._resolve(report)
+        output_dir = self._resolve(output_dir or self.output_dir)
+        if not os.path.isfile(report):
+            raise ValueError(f'Report not found: {report}')
+        if not os.path.isdir(output_dir):
+            raise ValueError(f'Output folder not found: {output_dir}')
+        overrides = {key: str(value) for key, value in overrides.items() if value is not None}
+        future = self._executor.submit(run_job, report, output_dir, overrides, self.cache)
+        job = Job(report, output_dir, overrides, future)
+        with self._lock:
+            self._prune()
+            self.jobs[job.id] = job
+        logger.info(f'Job {job.id}: {report}')
+        return job
+
+    def _resolve(self, path: str) -> str:
+        """Path from base folder, paths outside of base folder not allowed"""
+        base_dir = os.path.realpath(self.base_dir)
+        result = os.path.realpath(os.path.join(base_dir, path))
+        if os.path.commonpath([base_dir, result]) != base_dir:
+            raise ValueError(f'Path outside of service folder: {path}')
+        return result
+
+    def _prune(self) -> None:
+        """Remove oldest finished jobs over `JOBS_HISTORY`, called with lock"""
+        finished = [job_id for job_id, job in self.jobs.items() if job.future.done()]
+        for job_id in finished[:max(len(finished) - JOBS_HISTORY, 0)]:
+            del self.jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def shutdown(self) -> None:
+        """Cancel queued jobs and wait for running"""
+        with self._lock:
+            jobs = list(self.jobs.values())
+        for job in jobs:
+            job.future.cancel()
+        self._executor.shutdown(wait=True)
+
+
+class ServiceRequestHandler(BaseHTTPRequestHandler):
+    """
+    POST /jobs {"report": ..., "output_dir": ..., "code_to": ..., "reg_number": ...} - add job
+    GET /jobs - all jobs, GET /jobs/<id> - status of job and path to xml file
+    """
+    service: ConversionService = None
+
+    def _send(self, status: int, data: Any) -> None:
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:  # noqa: N802
+        parts = self.path.strip('/').split('/')
+        if parts == ['jobs']:
+            with self.service._lock:
+                jobs = list(self.service.jobs.values())
+            self._send(200, [job.dict() for job in jobs])
+            return
+        job = self.service.get(parts[1]) if len(parts) == 2 and parts[0] == 'jobs' else None
+        if job is None:
+            self._send(404, {'error': 'Not found'})
+            return
+        self._send(200, job.dict())
+
+    def do_POST(self) -> None:  # noqa: N802
+        if self.path.strip('/') != 'jobs':
+            self._send(404, {'error': 'Not found'})
+            return
+        try:
+            data = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            job = self.service.submit(data.pop('report'), data.pop('output_dir', None), **data)
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            self._send(400, {'error': f'{type(e).__name__}: {e}'})
+            return
+        self._send(202, job.dict())
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug(f'{self.address_string()} {format % args}')
+
+
+def create_server(service: ConversionService, host: str, port: int) -> ThreadingHTTPServer:
+    handler = type('Handler', (ServiceRequestHandler,), {'service': service})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def serve(service: ConversionService, host: str, port: int) -> None:
+    """Run service until interrupted"""
+    service.start()
+    server = create_server(service, host, port)
+    logger.info(f'Listen http://{host}:{server.server_port}/jobs')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info('Conversion service stopped')
+    finally:
+        server.server_close()
+        service.shutdown()
@@ -1,4 +1,5 @@
-from typing import Tuple
+from contextlib import contextmanager
+from typing import Iterator, Tuple
 
 from decouple import config
 from pydantic import BaseSettings
@@ -10,6 +11,15 @@ INPUT_DIR = config('INPUT_DIR', default='input')
 OUTPUT_DIR = config('OUTPUT_DIR', default='output')
 CODE_TO = config('CODE_TO', default='201000')
 REG_NUMBER = config('REG_NUMBER', default='034012008689')
+XML_PRETTY = config('XML_PRETTY', default=True, cast=bool)
+WORKERS = config('WORKERS', default=0, cast=int)
+READER = config('READER', default='openpyxl')
+CACHE_DIR = config('CACHE_DIR', default='.cache')
+CACHE_SIZE = config('CACHE_SIZE', default=512, cast=int)
+SERVICE_HOST = config('SERVICE_HOST', default='127.0.0.1')
+SERVICE_PORT = config('SERVICE_PORT', default=8765, cast=int)
+WATCH_INTERVAL = config('WATCH_INTERVAL', default=1.0, cast=float)
+WATCH_SETTLE = config('WATCH_SETTLE', default=2.0, cast=float)
 
 
 class Settings(BaseSettings):
@@ -19,3 +29,29 @@ class Settings(BaseSettings):
     output_dir: str = OUTPUT_DIR
     code_to: str = CODE_TO
     reg_number: str = REG_NUMBER
+    xml_pretty: bool = XML_PRETTY
+    workers: int = WORKERS
+    reader: str = READER
+    cache_dir: str = CACHE_DIR
+    cache_size: int = CACHE_SIZE
+    service_host: str = SERVICE_HOST
+    service_port: int = SERVICE_PORT
+    watch_interval: float = WATCH_INTERVAL
+    watch_settle: float = WATCH_SETTLE
+
+
+# shared instance, config read once per process
+settings = Settings()
+
+
+@contextmanager
+def override_settings(**values) -> Iterator[None]:
+    """Temporarily change shared settings"""
+    previous = {key: getattr(settings, key) for key in values}
+    for key, value in values.items():
+        setattr(settings, key, value)
+    try:
+        yield
+    finally:
+        for key, value in previous.items():
+            setattr(settings, key, value)
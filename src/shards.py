@@ -0,0 +1,117 @@
+import json
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+from src.cache import SheetCache
+from src.converter import create_xml_file_name, load_report
+from src.handlers import create_xml_file
+from src.models import Employee, ExecutiveSalary, Period, SalaryFund
+
+MANIFEST_SUFFIX = '.manifest.json'
+
+
+def _copy_period(period: Period, employees: List[Employee]) -> Period:
+    shard_period = Period(year=period.year, month=period.month)
+    shard_period.employee = employees
+    return shard_period
+
+
+def split_by_period(periods: List[Period]) -> List[List[Period]]:
+    """One shard for each period"""
+    return [[period] for period in periods]
+
+
+def split_by_employees(periods: List[Period], max_employees: int) -> List[List[Period]]:
+    """
+    Shards with at most `max_employees` employees of all periods,
+    period with more employees than left in shard continued in next shard.
+    """
+    if max_employees < 1:
+        raise ValueError(f'Max employees in file must be positive: {max_employees}')
+    shards, shard, count = [], [], 0
+    for period in periods:
+        employees = period.employee
+        while employees:
+            part = employees[:max_employees - count]
+            shard.append(_copy_period(period, part))
+            count += len(part)
+            employees = employees[len(part):]
+            if count == max_employees:
+                shards.append(shard)
+                shard, count = [], 0
+    if shard:
+        shards.append(shard)
+    return shards
+
+
+def _write_shard(
+        xml_file: str,
+        periods: List[Period],
+        salary_fund_data: List[SalaryFund],
+        executive_salary: List[ExecutiveSalary],
+        guid: str,
+        totals: bool = True,
+) -> Dict[str, Any]:
+    """Write one document of report, return entry of manifest"""
+    create_xml_file(xml_file, periods, salary_fund_data, executive_salary, guid, totals=totals)
+    logger.info(f'Complete generate xml file: {os.path.basename(xml_file)}')
+    snils = {Employee.display_value(employee.snils) for period in periods for employee in period.employee}
+    return {
+        'file': os.path.basename(xml_file),
+        'guid': guid,
+        'periods': [f'{period.year}-{period.month:02d}' for period in periods],
+        'employees': sum(len(period.employee) for period in periods),
+        'snils': sorted(snils),
+        'totals': totals,
+    }
+
+
+def create_manifest_file_name(report_file: str, guid: str) -> str:
+    """Manifest name with GUID of first document, manifests of previous runs not overwritten"""
+    return f'{os.path.splitext(os.path.basename(report_file))[0]}_{guid}{MANIFEST_SUFFIX}'
+
+
+def convert_report_sharded(
+        report_file: str,
+        output_dir: str,
+        by_period: bool = False,
+        max_employees: int = 0,
+        workers: Optional[int] = None,
+        cache: Optional[SheetCache] = None,
+) -> List[str]:
+    """
+    Convert report to several xml documents, section СЗП split by period or by number of employees.
+    Every document has own GUID and organization section. Salary fund and executive salaries
+    sections (ФондЗП, СЗПРук) written only to the first document, so totals not counted for each file.
+    Documents written in parallel processes, manifest with periods and SNILS of each file
+    written to output folder next to documents.
+    :param by_period: bool - one document for each period
+    :param max_employees: int - max number of employees in document, if not split by period
+    :param workers: int - number of processes, by default number of processors
+    :return: list of paths to created xml files
+    """
+    salary_by_period_data, salary_fund_data, executive_salary = load_report(report_file, cache)
+    if by_period:
+        shards = split_by_period(salary_by_period_data)
+    else:
+        shards = split_by_employees(salary_by_period_data, max_employees)
+    logger.info(f'Generate {len(shards)} xml files start')
+    with ProcessPoolExecutor(max_workers=workers or None) as executor:
+        futures = []
+        for number, periods in enumerate(shards):
+            guid = str(uuid.uuid4())
+            xml_file = os.path.join(output_dir, create_xml_file_name(guid))
+            futures.append(
+                executor.submit(
+                    _write_shard, xml_file, periods, salary_fund_data, executive_salary, guid, number == 0))
+        files = [future.result() for future in futures]
+    manifest_guid = files[0]['guid'] if files else str(uuid.uuid4())
+    manifest_file = os.path.join(output_dir, create_manifest_file_name(report_file, manifest_guid))
+    with open(manifest_file, mode='w', encoding='utf-8') as result:
+        json.dump({'report': os.path.basename(report_file), 'files': files}, result, ensure_ascii=False, indent=4)
+    logger.info(f'Manifest of xml files: {os.path.basename(manifest_file)}')
+    return [os.path.join(output_dir, item['file']) for item in files]
@@ -0,0 +1,29 @@
+import shutil
+from pathlib import Path
+
+from src.batch import convert_directory, find_reports
+
+EXAMPLE_REPORT = Path(__file__).resolve().parents[2] / 'input' / 'example.xlsx'
+
+
+def test_find_reports(tmp_path):
+    for name in ('b.xlsx', 'a.XLSX', '~$a.xlsx', 'notes.txt'):
+        (tmp_path / name).touch()
+    assert find_reports(str(tmp_path)) == [str(tmp_path / 'a.XLSX'), str(tmp_path / 'b.xlsx')]
+
+
+def test_convert_directory_continue_after_error(tmp_path):
+    input_dir, output_dir = tmp_path / 'input', tmp_path / 'output'
+    input_dir.mkdir()
+    output_dir.mkdir()
+    shutil.copy(EXAMPLE_REPORT, input_dir / 'first.xlsx')
+    (input_dir / 'broken.xlsx').write_bytes(b'not a workbook')
+    shutil.copy(EXAMPLE_REPORT, input_dir / 'second.xlsx')
+
+    results = convert_directory(str(input_dir), str(output_dir), workers=2)
+
+    assert [Path(result.report).name for result in results] == ['broken.xlsx', 'first.xlsx', 'second.xlsx']
+    assert [result.success for result in results] == [False, True, True]
+    xml_files = sorted(output_dir.glob('*.xml'))
+    assert len(xml_files) == 2
+    assert all(xml_file.name.startswith('ПФР_') for xml_file in xml_files)
@@ -0,0 +1,20 @@
+from benchmarks.generator import generate_report
+from benchmarks.run import compare
+from src.converter import load_report
+
+
+def test_generate_report(tmp_path):
+    report_file = tmp_path / 'report.xlsx'
+    assert generate_report(str(report_file), employees=5, periods=14, rows_per_employee=2) == 140
+    salary_by_period_data, salary_fund_data, executive_salary = load_report(str(report_file))
+    assert [(period.year, period.month) for period in salary_by_period_data][-3:] == [(2020, 12), (2021, 1), (2021, 2)]
+    assert all(len(period.employee) == 5 for period in salary_by_period_data)
+    assert all(len(employee.salary) == 2 for employee in salary_by_period_data[0].employee)
+    assert [item.year for item in salary_fund_data] == [item.year for item in executive_salary] == [2020, 2021]
+
+
+def test_compare_with_baseline():
+    baseline = {'10x1': {'load_salary': {'rows_per_second': 100, 'peak_memory_mb': 10}}}
+    assert compare({'10x1': {'load_salary': {'rows_per_second': 80, 'peak_memory_mb': 12}}}, baseline, 0.3) == []
+    regressions = compare({'10x1': {'load_salary': {'rows_per_second': 50, 'peak_memory_mb': 20}}}, baseline, 0.3)
+    assert len(regressions) == 2
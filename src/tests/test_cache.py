@@ -0,0 +1,63 @@
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+from src import converter
+from src.cache import SheetCache
+
+EXAMPLE_REPORT = Path(__file__).resolve().parents[2] / 'input' / 'example.xlsx'
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return SheetCache(str(tmp_path / 'cache'), 1024 * 1024)
+
+
+def test_load_report_from_cache(cache, monkeypatch):
+    expected = converter.load_report(str(EXAMPLE_REPORT), cache)
+    assert len(list(Path(cache.cache_dir).iterdir())) == 3
+
+    def fail_open_workbook(*args, **kwargs):
+        raise AssertionError('Workbook opened')
+
+    monkeypatch.setattr(converter, 'open_workbook', fail_open_workbook)
+    assert converter.load_report(str(EXAMPLE_REPORT), cache) == expected
+
+
+def test_cache_key_depend_on_sheet_content(cache, tmp_path):
+    models = {name: model for name, model, _ in converter.SHEETS}
+    copy_report = tmp_path / 'copy.xlsx'
+    shutil.copy(EXAMPLE_REPORT, copy_report)
+    keys = cache.keys(str(EXAMPLE_REPORT), models)
+    assert cache.keys(str(copy_report), models) == keys
+    assert len(set(keys.values())) == 3
+
+
+def test_cache_evict_least_recently_used(tmp_path):
+    cache = SheetCache(str(tmp_path), 1200)
+    for key in ('first', 'second', 'third'):
+        cache.set(key, [key * 100])
+    assert cache.get('first') is None
+    assert cache.get('third') == ['third' * 100]
+    cache.clear()
+    assert cache.get('third') is None
+
+
+def test_cache_evict_file_removed_by_other_process(tmp_path, monkeypatch):
+    cache = SheetCache(str(tmp_path), 1200)
+    for key in ('first', 'second'):
+        cache.set(key, [key * 100])
+    scandir = os.scandir
+
+    def scandir_with_removed(path):
+        entries = list(scandir(path))
+        # entries listed, then removed by evicting worker
+        for entry in entries:
+            os.remove(entry.path)
+        return entries
+
+    monkeypatch.setattr('src.cache.os.scandir', scandir_with_removed)
+    cache.set('third', ['third' * 100])
+    cache.clear()
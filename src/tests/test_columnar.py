@@ -0,0 +1,57 @@
+from pathlib import Path
+
+import pytest
+from openpyxl import load_workbook
+
+from src.models import Salary
+
+np = pytest.importorskip('numpy')
+
+from src.columnar import SalaryColumns, load_salary_columns  # noqa: E402
+
+EXAMPLE_REPORT = Path(__file__).resolve().parents[2] / 'input' / 'example.xlsx'
+FIELDS = list(Salary.__fields__)
+
+
+def _row(**values):
+    row = dict.fromkeys(FIELDS, 0)
+    row.update(year=2020, month=1, okfs=13, staff_category_code=600, bid=1, employee_name='Иванов Иван')
+    row.update(values)
+    return tuple(row[name] for name in FIELDS)
+
+
+def test_check_ranges_and_totals():
+    columns = SalaryColumns.from_rows([
+        _row(accruals_based_on_tariff_rates=100, awards=50.5, total_accruals=150.5),
+        _row(okfs=20, bid=1.5, awards=10, total_accruals=1),
+        _row(month='Февраль', staff_category_code=999, actual_time_worked=-1, total_accruals=100),
+        _row(year=None, number_working_hours_according='много', staff_category_code=None),
+    ])
+    assert columns.check() == {
+        'year': [9],
+        'okfs': [7],
+        'staff_category_code': [8, 9],
+        'bid': [7],
+        'number_working_hours_according': [9],
+        'actual_time_worked': [8],
+        'total_accruals': [7],
+    }
+
+
+def test_period_sums():
+    columns = SalaryColumns.from_rows([
+        _row(awards=10, total_accruals=10),
+        _row(month='января', awards=5, total_accruals=5),
+        _row(month=2, awards=1, total_accruals=1),
+    ])
+    sums = columns.period_sums(['awards', 'total_accruals'])
+    assert sums == {(2020, 1): {'awards': 15, 'total_accruals': 15}, (2020, 2): {'awards': 1, 'total_accruals': 1}}
+
+
+def test_load_salary_columns_example():
+    wb = load_workbook(filename=EXAMPLE_REPORT, read_only=True)
+    columns = load_salary_columns(wb['Раздел 1'])
+    wb.close()
+    assert len(columns) == 1
+    assert columns.check() == {}
+    assert columns.period_sums(['total_accruals']) == {(2020, 1): {'total_accruals': 122431}}
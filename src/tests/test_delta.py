@@ -0,0 +1,107 @@
+import os
+import re
+from pathlib import Path
+
+import pytest
+from openpyxl import load_workbook
+
+from benchmarks.generator import generate_report
+from src.converter import convert_report
+from src.delta import PreviousReportError, convert_report_delta, read_previous_report
+from src.handlers import SALARY_MIN_ROW
+from src.row_hashes import file_digest, hashes_file_name, load_hashes
+from src.settings import override_settings
+
+SYSTEM_INFO = re.compile(r'<АФ5:GUID>.*?</АФ5:ДатаВремя>', re.DOTALL)
+
+
+def _content(xml_file: str) -> str:
+    """Xml report without GUID and date"""
+    return SYSTEM_INFO.sub('', Path(xml_file).read_text(encoding='utf-8'))
+
+
+@pytest.fixture
+def previous(tmp_path):
+    report_file = str(tmp_path / 'report.xlsx')
+    generate_report(report_file, employees=5, periods=3)
+    previous_dir = tmp_path / 'previous'
+    previous_dir.mkdir()
+    return report_file, convert_report(report_file, str(previous_dir))
+
+
+def _convert(report_file, previous_xml, tmp_path):
+    delta_dir, full_dir = tmp_path / 'delta', tmp_path / 'full'
+    delta_dir.mkdir(exist_ok=True)
+    full_dir.mkdir(exist_ok=True)
+    return convert_report_delta(report_file, previous_xml, str(delta_dir)), convert_report(report_file, str(full_dir))
+
+
+@pytest.mark.parametrize('stored_hashes', [True, False])
+@pytest.mark.parametrize('pretty', [True, False])
+def test_delta_regenerate_changed_period(tmp_path, pretty, stored_hashes):
+    with override_settings(xml_pretty=pretty):
+        report_file = str(tmp_path / 'report.xlsx')
+        generate_report(report_file, employees=5, periods=3)
+        previous_dir = tmp_path / 'previous'
+        previous_dir.mkdir()
+        previous_xml = convert_report(report_file, str(previous_dir))
+        if not stored_hashes:
+            # report created before hashes were stored, employees compared by xml nodes
+            os.remove(hashes_file_name(previous_xml))
+        wb = load_workbook(report_file)
+        # second employee of second month
+        wb['Раздел 1'][f'P{SALARY_MIN_ROW + 6}'] = 12345.67
+        wb.save(report_file)
+        result, full_xml = _convert(report_file, previous_xml, tmp_path)
+    assert result.copied == [(2020, 1), (2020, 3)]
+    assert result.regenerated == [(2020, 2)]
+    assert result.removed == []
+    assert _content(result.xml_file) == _content(full_xml)
+    assert '12345.67' in _content(result.xml_file)
+
+
+def test_delta_unchanged_report(tmp_path, previous):
+    report_file, previous_xml = previous
+    result, full_xml = _convert(report_file, previous_xml, tmp_path)
+    assert result.regenerated == []
+    assert _content(result.xml_file) == _content(previous_xml) == _content(full_xml)
+
+
+def test_delta_of_delta_report(tmp_path, previous):
+    """Hashes of rows written next to xml created in delta mode too"""
+    report_file, previous_xml = previous
+    with override_settings(xml_pretty=False):
+        result, _ = _convert(report_file, previous_xml, tmp_path)
+        assert result.copied == []
+        assert load_hashes(result.xml_file, file_digest(result.xml_file)) is not None
+        result, full_xml = _convert(report_file, result.xml_file, tmp_path)
+    assert result.regenerated == []
+    assert _content(result.xml_file) == _content(full_xml)
+
+
+def test_hashes_of_changed_xml_not_used(previous):
+    _, previous_xml = previous
+    digest = file_digest(previous_xml)
+    assert load_hashes(previous_xml, digest) is not None
+    with open(previous_xml, mode='ab') as xml_file:
+        xml_file.write(b'\n')
+    assert load_hashes(previous_xml, file_digest(previous_xml)) is None
+
+
+def test_delta_other_format_regenerate_all(tmp_path, previous):
+    report_file, previous_xml = previous
+    with read_previous_report(previous_xml) as previous_report:
+        pretty = previous_report.pretty
+    with override_settings(xml_pretty=not pretty):
+        result, full_xml = _convert(report_file, previous_xml, tmp_path)
+    assert result.copied == []
+    assert _content(result.xml_file) == _content(full_xml)
+
+
+@pytest.mark.parametrize('content', ['', '<root/>'])
+def test_not_previous_report(tmp_path, previous, content):
+    report_file, _ = previous
+    filename = tmp_path / 'previous.xml'
+    filename.write_text(content, encoding='utf-8')
+    with pytest.raises(PreviousReportError):
+        convert_report_delta(report_file, str(filename), str(tmp_path))
@@ -0,0 +1,147 @@
+import re
+from datetime import datetime
+from pathlib import Path
+from xml.etree import ElementTree
+
+import pytest
+from loguru import logger
+from openpyxl import Workbook, load_workbook
+
+from src.handlers import (
+    BLANK_ROW_LOOKAHEAD,
+    load_salary,
+    load_salary_fund,
+    load_executive_salaries,
+    create_group_by_period_salary_data,
+    create_xml_file,
+)
+from src.records import SalaryRecord
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+EXAMPLE_REPORT = BASE_DIR / 'input' / 'example.xlsx'
+EXAMPLE_XML = BASE_DIR / 'output' / 'example.xml'
+SYSTEM_NODE = '{http://пф.рф/СИоЗП/2021-03-15}СлужебнаяИнформация'
+
+
+def _represent_tree(node):
+    """Tree as nested tuples without whitespace and system info node"""
+    children = tuple(_represent_tree(child) for child in node if child.tag != SYSTEM_NODE)
+    return node.tag, (node.text or '').strip(), children
+
+
+@pytest.fixture(scope='module')
+def example_data():
+    wb = load_workbook(filename=EXAMPLE_REPORT, read_only=True)
+    data = (
+        list(load_salary(wb['Раздел 1'])),
+        list(load_salary_fund(wb['Раздел 2'])),
+        list(load_executive_salaries(wb['Раздел 3'])),
+    )
+    wb.close()
+    return data
+
+
+def test_group_by_period_salary_data(example_data):
+    salary_data, _, _ = example_data
+    periods = create_group_by_period_salary_data(salary_data)
+    assert [(period.year, period.month) for period in periods] == [(2020, 1)]
+    assert [employee.snils for employee in periods[0].employee] == [1111111111]
+    assert periods[0].employee[0].salary == salary_data
+
+
+def test_group_by_period_keep_only_employees_with_rows(example_data):
+    salary_data, _, _ = example_data
+    first_row = salary_data[0]
+    other_period_row = SalaryRecord(
+        **{**first_row.dict(), 'month': 2, 'snils': 2222222222, 'employee_name': 'Петров Петр'})
+    second_row = SalaryRecord(**{**first_row.dict(), 'total_accruals': 1.0})
+    periods = create_group_by_period_salary_data([other_period_row, first_row, second_row])
+    assert [(period.year, period.month) for period in periods] == [(2020, 1), (2020, 2)]
+    assert [employee.snils for employee in periods[0].employee] == [1111111111]
+    assert periods[0].employee[0].salary == [first_row, second_row]
+    assert [employee.snils for employee in periods[1].employee] == [2222222222]
+
+
+def test_create_xml_file_equal_example(example_data, tmp_path):
+    salary_data, salary_fund_data, executive_salary = example_data
+    xml_file = tmp_path / 'report.xml'
+    create_xml_file(
+        xml_file,
+        create_group_by_period_salary_data(salary_data),
+        salary_fund_data,
+        executive_salary,
+        'guid',
+    )
+    result = _represent_tree(ElementTree.parse(xml_file).getroot())
+    expected = _represent_tree(ElementTree.parse(EXAMPLE_XML).getroot())
+    assert result == expected
+
+
+@pytest.mark.parametrize('pretty', [True, False])
+def test_create_xml_file_layout(example_data, tmp_path, pretty):
+    salary_data, salary_fund_data, executive_salary = example_data
+    xml_file = tmp_path / 'report.xml'
+    create_xml_file(
+        xml_file,
+        create_group_by_period_salary_data(salary_data),
+        salary_fund_data,
+        executive_salary,
+        '9c467c32-ea5f-4d7f-b77c-25eee3028659',
+        pretty=pretty,
+        created_at=datetime(2021, 3, 28, 2, 37, 12, 619833),
+    )
+    expected = EXAMPLE_XML.read_bytes()
+    if not pretty:
+        declaration, body = expected.split(b'\n', 1)
+        body = re.sub(rb'\s+xmlns', b' xmlns', re.sub(rb'>\s+<', b'><', body))
+        expected = declaration + b'\n' + body
+    assert xml_file.read_bytes() == expected
+
+
+def test_create_xml_file_not_leave_partial_file(example_data, tmp_path):
+    salary_data, salary_fund_data, executive_salary = example_data
+
+    def periods():
+        yield from create_group_by_period_salary_data(salary_data)
+        raise RuntimeError('error of period')
+
+    with pytest.raises(RuntimeError):
+        create_xml_file(tmp_path / 'report.xml', periods(), salary_fund_data, executive_salary, 'guid')
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_load_stop_at_first_blank_row():
+    ws = Workbook().active
+    for header in ('Раздел 3', 'Год', 1):
+        ws.append([header])
+    for year in (2020, 2021):
+        ws.append([year, 1111111111, 111111111, 1, 2, 3, 4])
+    ws.append([None] * 7)
+    ws.append([2022, 1111111111, 111111111, 1, 2, 3, 4])
+    executive_salary = load_executive_salaries(ws)
+    assert not isinstance(executive_salary, list)
+    messages = []
+    sink = logger.add(messages.append, level='WARNING')
+    try:
+        assert [item.year for item in executive_salary] == [2020, 2021]
+    finally:
+        logger.remove(sink)
+    assert len(messages) == 1
+    assert 'rows after blank row 6 not loaded, first is 7' in messages[0]
+
+
+def test_load_rows_far_after_blank_row_not_read():
+    ws = Workbook().active
+    for header in ('Раздел 3', 'Год', 1):
+        ws.append([header])
+    ws.append([2020, 1111111111, 111111111, 1, 2, 3, 4])
+    for _ in range(BLANK_ROW_LOOKAHEAD + 1):
+        ws.append([None] * 7)
+    ws.append([2022, 1111111111, 111111111, 1, 2, 3, 4])
+    messages = []
+    sink = logger.add(messages.append, level='WARNING')
+    try:
+        assert [item.year for item in load_executive_salaries(ws)] == [2020]
+    finally:
+        logger.remove(sink)
+    assert messages == []
@@ -1,6 +1,6 @@
 import pytest
 
-from src.helpers import convert_experience, decompose_full_name
+from src.helpers import convert_experience, decompose_full_name, get_mount_number
 
 
 @pytest.mark.parametrize(
@@ -25,3 +25,37 @@ def test_convert_exchange(test_input, expected):
 )
 def test_decompose_full_name(test_input, expected):
     assert decompose_full_name(test_input) == expected
+
+
+@pytest.mark.parametrize(
+    'test_input, expected',
+    [
+        ('Январь', 1),
+        ('января', 1),
+        ('ФЕВРАЛЬ', 2),
+        ('мае', 5),
+        ('сент.', 9),
+        (' Декабрь ', 12),
+        ('3', 3),
+    ],
+)
+def test_get_mount_number(test_input, expected):
+    assert get_mount_number(test_input) == expected
+
+
+def test_get_mount_number_unknown_spelling():
+    assert get_mount_number('января 2020') == 1
+
+
+@pytest.mark.parametrize(
+    'function, value, error',
+    [
+        (get_mount_number, 'abc', ValueError),
+        (get_mount_number, None, TypeError),
+        (convert_experience, None, TypeError),
+        (convert_experience, 5, TypeError),
+    ],
+)
+def test_convert_errors(function, value, error):
+    with pytest.raises(error):
+        function(value)
@@ -0,0 +1,49 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+# cumulative import time of entry point, seconds
+IMPORT_TIME_LIMIT = 0.5
+# loaded only when conversion started
+LAZY_MODULES = ('openpyxl', 'dateparser', 'numpy', 'src.handlers', 'src.models', 'src.converter')
+
+
+def _import_times(module: str, cwd: Path) -> Dict[str, float]:
+    """Cumulative import time in seconds by module name from `python -X importtime`"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=cwd,
+        env={**os.environ, 'PYTHONPATH': str(ROOT)},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        times[name.strip()] = int(cumulative) / 1_000_000
+    return times
+
+
+@pytest.fixture(scope='module')
+def main_import_times(tmp_path_factory):
+    cwd = tmp_path_factory.mktemp('import')
+    # first run compiles bytecode
+    _import_times('main', cwd)
+    return _import_times('main', cwd)
+
+
+@pytest.mark.parametrize('module', LAZY_MODULES)
+def test_main_not_import_heavy_modules(main_import_times, module):
+    assert module not in main_import_times
+
+
+def test_main_import_time(main_import_times):
+    assert main_import_times['main'] < IMPORT_TIME_LIMIT
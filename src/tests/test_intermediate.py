@@ -0,0 +1,63 @@
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from src.converter import load_report
+from src.intermediate import IntermediateFormatError, IntermediateReader, parse_report, render_report
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+EXAMPLE_REPORT = BASE_DIR / 'input' / 'example.xlsx'
+EXAMPLE_XML = BASE_DIR / 'output' / 'example.xml'
+GUID = '9c467c32-ea5f-4d7f-b77c-25eee3028659'
+CREATED_AT = datetime(2021, 3, 28, 2, 37, 12, 619833)
+
+
+def test_read_equal_report(tmp_path):
+    filename = parse_report(str(EXAMPLE_REPORT), str(tmp_path / 'example.siozp'))
+    periods, salary_fund_data, executive_salary = load_report(str(EXAMPLE_REPORT))
+    with IntermediateReader(filename) as reader:
+        result = list(reader.periods())
+        assert [period.dict() for period in result] == [period.dict() for period in periods]
+        assert [
+            [[row.dict() for row in employee.salary] for employee in period.employee] for period in result
+        ] == [
+            [[row.dict() for row in employee.salary] for employee in period.employee] for period in periods
+        ]
+        assert reader.salary_fund_data == salary_fund_data
+        assert reader.executive_salary == executive_salary
+
+
+def test_render_equal_example(tmp_path):
+    filename = parse_report(str(EXAMPLE_REPORT), str(tmp_path / 'example.siozp'))
+    xml_file, guid = render_report(filename, str(tmp_path), GUID, CREATED_AT)
+    assert guid == GUID
+    assert Path(xml_file).read_bytes() == EXAMPLE_XML.read_bytes()
+
+
+@pytest.mark.parametrize('content', [b'not intermediate report', b'', b'SIOZP\x00\xff\x00\x00\x00{"ver'])
+def test_not_intermediate_file(tmp_path, content):
+    filename = tmp_path / 'report.siozp'
+    filename.write_bytes(content)
+    with pytest.raises(IntermediateFormatError):
+        IntermediateReader(str(filename))
+
+
+@pytest.mark.parametrize('cut', [100, 300, 600])
+def test_truncated_data_sections(tmp_path, cut):
+    filename = parse_report(str(EXAMPLE_REPORT), str(tmp_path / 'example.siozp'))
+    content = Path(filename).read_bytes()
+    Path(filename).write_bytes(content[:-cut])
+    with pytest.raises(IntermediateFormatError):
+        with IntermediateReader(filename) as reader:
+            list(reader.periods())
+
+
+def test_missing_header_key(tmp_path):
+    filename = parse_report(str(EXAMPLE_REPORT), str(tmp_path / 'example.siozp'))
+    content = Path(filename).read_bytes()
+    # same length, reader finds no `periods` key
+    Path(filename).write_bytes(content.replace(b'"periods"', b'"periodz"', 1))
+    with pytest.raises(IntermediateFormatError):
+        with IntermediateReader(filename) as reader:
+            list(reader.periods())
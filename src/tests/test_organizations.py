@@ -0,0 +1,58 @@
+import re
+from xml.etree import ElementTree
+
+from benchmarks.generator import INN, KPP, generate_report
+from src.converter import convert_report
+from src.organizations import convert_organization, convert_report_by_organization, partition_report
+
+SYSTEM_VALUES = re.compile(r'<АФ5:(GUID|ДатаВремя)>[^<]*<')
+
+
+def _read_xml(filename):
+    with open(filename, encoding='utf-8') as result:
+        return SYSTEM_VALUES.sub('', result.read())
+
+
+def test_partition_report(tmp_path):
+    report_file = str(tmp_path / 'report.xlsx')
+    generate_report(report_file, employees=5, periods=2, organizations=2)
+    parts = partition_report(report_file, str(tmp_path))
+    assert sorted(parts) == [(INN, KPP), (INN + 1, KPP + 1)]
+    assert all(sorted(sheets) == ['Раздел 1', 'Раздел 2', 'Раздел 3'] for sheets in parts.values())
+
+
+def test_convert_report_by_organization(tmp_path):
+    report_file = str(tmp_path / 'report.xlsx')
+    generate_report(report_file, employees=7, periods=2, organizations=3)
+    output_dir = tmp_path / 'output'
+    output_dir.mkdir()
+
+    results = convert_report_by_organization(report_file, str(output_dir), workers=2)
+
+    assert [(result.inn, result.kpp, result.success) for result in results] == [
+        (INN + organization, KPP + organization, True) for organization in range(3)]
+    for organization, result in enumerate(results):
+        root = ElementTree.parse(result.xml_file).getroot()
+        assert {node.text for node in root.findall('.//{*}Организация/{*}ИНН')} == {str(INN + organization)}
+        snils = {int(node.text) - 10000000000 for node in root.findall('.//{*}СНИЛС')}
+        assert snils == {employee for employee in range(7) if employee % 3 == organization}
+
+
+def test_convert_one_organization_equal_report(tmp_path):
+    report_file = str(tmp_path / 'report.xlsx')
+    generate_report(report_file, employees=4, periods=3)
+    (tmp_path / 'report').mkdir()
+    (tmp_path / 'organizations').mkdir()
+    expected = convert_report(report_file, str(tmp_path / 'report'))
+    [result] = convert_report_by_organization(report_file, str(tmp_path / 'organizations'), workers=1)
+    assert _read_xml(result.xml_file) == _read_xml(expected)
+
+
+def test_convert_organization_without_fund(tmp_path):
+    report_file = str(tmp_path / 'report.xlsx')
+    generate_report(report_file, employees=2, periods=1)
+    [sheets] = partition_report(report_file, str(tmp_path)).values()
+    del sheets['Раздел 2']
+    result = convert_organization((INN, KPP), sheets, str(tmp_path))
+    assert not result.success
+    assert 'Раздел 2' in result.error
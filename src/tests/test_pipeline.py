@@ -0,0 +1,72 @@
+import os
+import re
+
+import pytest
+from openpyxl import load_workbook
+
+from benchmarks.generator import generate_report
+from src.converter import convert_report
+from src.handlers import SALARY_MIN_ROW, create_group_by_period_salary_data
+from src.pipeline import UnorderedPeriodsError, convert_report_pipelined, iter_periods
+from src.records import SalaryRecord
+from src.row_hashes import HASHES_SUFFIX
+from src.tests.test_records import ROW
+
+SYSTEM_VALUES = re.compile(r'<АФ5:(GUID|ДатаВремя)>[^<]*<')
+
+
+def _record(year, month, snils, name):
+    return SalaryRecord(**{**ROW, 'year': year, 'month': month, 'snils': snils, 'employee_name': name})
+
+
+def _read_xml(filename):
+    with open(filename, encoding='utf-8') as result:
+        return SYSTEM_VALUES.sub('', result.read())
+
+
+def test_iter_periods_equal_grouping():
+    rows = [
+        _record(2020, 1, 2, 'Петров Петр Петрович'),
+        _record(2020, 1, 1, 'Иванов Иван Иванович'),
+        _record(2020, 1, 2, 'Петров Петр Петрович'),
+        _record(2020, 2, 1, 'Иванов Иван Иванович'),
+        _record(2021, 1, 1, 'Иванов Иван Иванович'),
+    ]
+    assert list(iter_periods(rows)) == create_group_by_period_salary_data(rows)
+
+
+def test_iter_periods_unordered():
+    rows = [_record(2020, 2, 1, 'Иванов Иван Иванович'), _record(2020, 1, 1, 'Иванов Иван Иванович')]
+    with pytest.raises(UnorderedPeriodsError):
+        list(iter_periods(rows))
+
+
+@pytest.mark.parametrize('unordered', [False, True])
+def test_convert_report_pipelined_equal_sequential(tmp_path, unordered):
+    report_file = str(tmp_path / 'report.xlsx')
+    generate_report(report_file, employees=7, periods=5, rows_per_employee=2)
+    if unordered:
+        wb = load_workbook(report_file)
+        ws = wb['Раздел 1']
+        rows = list(ws.iter_rows(min_row=SALARY_MIN_ROW, values_only=True))
+        ws.delete_rows(SALARY_MIN_ROW, len(rows))
+        for row in reversed(rows):
+            ws.append(row)
+        wb.save(report_file)
+    sequential_dir, pipeline_dir = tmp_path / 'sequential', tmp_path / 'pipeline'
+    sequential_dir.mkdir()
+    pipeline_dir.mkdir()
+
+    expected = convert_report(report_file, str(sequential_dir))
+    result = convert_report_pipelined(report_file, str(pipeline_dir))
+
+    assert [path.name for path in pipeline_dir.iterdir() if path.suffix != HASHES_SUFFIX] == [os.path.basename(result)]
+    assert _read_xml(result) == _read_xml(expected)
+
+
+def test_convert_report_pipelined_error(tmp_path):
+    report_file = tmp_path / 'broken.xlsx'
+    report_file.write_bytes(b'not a workbook')
+    with pytest.raises(Exception):
+        convert_report_pipelined(str(report_file), str(tmp_path))
+    assert list(tmp_path.iterdir()) == [report_file]
@@ -0,0 +1,27 @@
+import time
+
+from src.profiling import Profiler
+
+
+def _slow_rows(count: int):
+    for index in range(count):
+        time.sleep(0.01)
+        yield index
+
+
+def test_nested_iterator_time_excluded_from_stage():
+    profiler = Profiler()
+    with profiler.stage('group'):
+        rows = list(profiler.iterate('load', _slow_rows(5)))
+    stages = {stage['stage']: stage for stage in profiler.dict()}
+    assert rows == [0, 1, 2, 3, 4]
+    assert stages['load']['rows'] == 5
+    assert stages['load']['seconds'] >= 0.05
+    assert stages['group']['seconds'] < 0.01
+
+
+def test_disabled_profiler():
+    profiler = Profiler(enabled=False)
+    with profiler.stage('group'):
+        assert list(profiler.iterate('load', range(3))) == [0, 1, 2]
+    assert all(stage['seconds'] == 0 for stage in profiler.dict())
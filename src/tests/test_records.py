@@ -0,0 +1,148 @@
+import pytest
+from loguru import logger
+from pydantic import BaseModel, Field, ValidationError, validator
+
+from src.models import Salary
+from src.records import ModelRecord, RowValidator, SalaryRecord, validate_salary
+
+
+class Count(BaseModel):
+    count: int = Field(gt=0, lt=10)
+
+
+class CountRecord(ModelRecord):
+    __slots__ = tuple(Count.__fields__)
+    model = Count
+
+
+class Limits(BaseModel):
+    count: int = Field(gt=0, lt=10)
+    share: float = Field(multiple_of=0.5)
+    name: str
+
+    @validator('name')
+    def strip_name(cls, value, values):
+        return value.strip()
+
+
+class LimitsRecord(ModelRecord):
+    __slots__ = tuple(Limits.__fields__)
+    model = Limits
+
+
+validate_count = RowValidator(CountRecord)
+validate_limits = RowValidator(LimitsRecord)
+
+ROW = {
+    **dict.fromkeys(Salary.__fields__),
+    'year': 2020,
+    'month': 1,
+    'inn': 1111111111,
+    'kpp': 111111111,
+    'okfs': 13,
+    'org_type': 12,
+    'employee_name': 'Иванова Наталья Ивановна',
+    'snils': 1111111111,
+    'work_experience': 1,
+    'position': 'Водитель автомобиля',
+    'staff_category_code': 600,
+    'employment_conditions': 'Основное',
+    'bid': 1,
+    'number_working_hours_according': 173.3,
+    'actual_time_worked': 192,
+    'accruals_based_on_tariff_rates': 9179.39,
+    'experience_for_additional_payments': '5 лет 10 мес',
+    'qualification_category': 'высшая',
+    'total_accruals': 122431,
+}
+
+
+@pytest.mark.parametrize(
+    'update',
+    [
+        {},
+        {'month': 'Февраль'},
+        {'okfs': 13.0},
+        {'bid': '0.5'},
+        {'hazard_class': 2.0},
+        {'academic_degree': 'доктор наук', 'qualification_category': None},
+    ],
+)
+def test_validate_salary_equal_model(update):
+    values = {**ROW, **update}
+    record = validate_salary(values)
+    assert isinstance(record, SalaryRecord)
+    assert record == SalaryRecord.from_model(Salary(**values))
+    assert record.represent_to_xml() == Salary(**values).represent_to_xml()
+
+
+@pytest.mark.parametrize(
+    'update',
+    [
+        {'inn': 111},
+        {'okfs': 20},
+        {'staff_category_code': 999},
+        {'bid': 2},
+        {'actual_time_worked': -1},
+        {'position': None},
+        {'employment_conditions': 'Временное'},
+    ],
+)
+def test_validate_salary_errors_equal_model(update):
+    values = {**ROW, **update}
+    with pytest.raises(ValidationError) as expected:
+        Salary(**values)
+    with pytest.raises(ValidationError) as result:
+        validate_salary(values)
+    assert result.value.errors() == expected.value.errors()
+
+
+def test_invalid_category_code_not_logged_by_validator():
+    """Model validation repeated after fast path, validators must not log, error logged once by loader"""
+    messages = []
+    sink = logger.add(messages.append, level='ERROR')
+    try:
+        with pytest.raises(ValidationError) as error:
+            validate_salary({**ROW, 'staff_category_code': 999})
+    finally:
+        logger.remove(sink)
+    assert messages == []
+    assert '999' in str(error.value)
+
+
+def test_record_to_model():
+    record = validate_salary(ROW)
+    assert record.to_model() == Salary(**ROW)
+
+
+def test_validate_salary_share_strings():
+    first, second = validate_salary({**ROW, 'inn': 2222222222}), validate_salary({**ROW, 'inn': 2222222222})
+    assert first.inn == '2222222222'
+    assert first.inn is second.inn
+    assert first.experience_for_additional_payments is second.experience_for_additional_payments
+
+
+def test_validate_compiled():
+    assert isinstance(validate_salary._validate(ROW), SalaryRecord)
+    assert validate_count._validate({'count': 9}).count == 9
+
+
+@pytest.mark.parametrize(
+    'model, validate, values',
+    [
+        (Count, validate_count, {'count': 0}),
+        (Count, validate_count, {'count': 10}),
+        (Limits, validate_limits, {'count': 1, 'share': 0.3, 'name': 'a'}),
+    ],
+)
+def test_validate_constraints_equal_model(model, validate, values):
+    with pytest.raises(ValidationError) as expected:
+        model(**values)
+    with pytest.raises(ValidationError) as result:
+        validate(values)
+    assert result.value.errors() == expected.value.errors()
+
+
+def test_validate_by_model_fields_not_compiled():
+    record = validate_limits({'count': 9, 'share': 1.5, 'name': ' a '})
+    assert record == LimitsRecord.from_model(Limits(count=9, share=1.5, name='a'))
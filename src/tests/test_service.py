@@ -0,0 +1,93 @@
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+import pytest
+
+from src.service import ConversionService, create_server
+
+EXAMPLE_REPORT = Path(__file__).resolve().parents[2] / 'input' / 'example.xlsx'
+
+
+@pytest.fixture
+def service(tmp_path):
+    (tmp_path / 'input').mkdir()
+    (tmp_path / 'output').mkdir()
+    shutil.copy(EXAMPLE_REPORT, tmp_path / 'input' / 'report.xlsx')
+    service = ConversionService(str(tmp_path), 'output', workers=1)
+    yield service
+    service.shutdown()
+
+
+@pytest.fixture
+def server(service):
+    service.start()
+    http_server = create_server(service, '127.0.0.1', 0)
+    thread = threading.Thread(target=http_server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{http_server.server_port}'
+    http_server.shutdown()
+    http_server.server_close()
+
+
+def _request(url, data=None):
+    request = Request(url, data=json.dumps(data).encode('utf-8') if data is not None else None)
+    try:
+        with urlopen(request, timeout=10) as response:
+            return response.status, json.loads(response.read())
+    except HTTPError as error:
+        return error.code, json.loads(error.read())
+
+
+def test_service_convert_report(server):
+    status, job = _request(f'{server}/jobs', {'report': 'input/report.xlsx', 'code_to': '999999'})
+    assert status == 202
+    for _ in range(100):
+        status, job = _request(f'{server}/jobs/{job["id"]}')
+        if job['status'] not in ('queued', 'running'):
+            break
+        time.sleep(0.1)
+    assert job['status'] == 'done', job['error']
+    assert os.path.basename(job['xml_file']).startswith('ПФР_999999_СИоЗП_')
+    assert os.path.exists(job['xml_file'])
+    assert [item['id'] for item in _request(f'{server}/jobs')[1]] == [job['id']]
+
+
+@pytest.mark.parametrize(
+    'path, data, expected',
+    [
+        ('/jobs/unknown', None, 404),
+        ('/jobs', {'report': 'input/missing.xlsx'}, 400),
+        ('/jobs', {'report': 'input/report.xlsx', 'report_dir': 'input'}, 400),
+        ('/jobs', {}, 400),
+        ('/jobs', {'report': str(EXAMPLE_REPORT)}, 400),
+        ('/jobs', {'report': '../report.xlsx'}, 400),
+        ('/jobs', {'report': 'input/report.xlsx', 'output_dir': '/'}, 400),
+    ],
+)
+def test_service_errors(server, path, data, expected):
+    status, result = _request(f'{server}{path}', data)
+    assert status == expected
+    assert result['error']
+
+
+def test_service_keep_limited_history(service, monkeypatch):
+    monkeypatch.setattr('src.service.JOBS_HISTORY', 1)
+    jobs = []
+    for _ in range(3):
+        jobs.append(service.submit('input/report.xlsx'))
+        jobs[-1].future.result(timeout=30)
+    assert list(service.jobs) == [jobs[1].id, jobs[2].id]
+
+
+def test_service_shutdown_cancel_queued_jobs(service):
+    jobs = [service.submit('input/report.xlsx') for _ in range(5)]
+    service.shutdown()
+    statuses = [job.status for job in jobs]
+    assert 'cancelled' in statuses
+    assert set(statuses) <= {'done', 'cancelled'}
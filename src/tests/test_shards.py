@@ -0,0 +1,74 @@
+import json
+from xml.etree import ElementTree
+
+import pytest
+
+from benchmarks.generator import generate_report
+from src.converter import load_report
+from src.models import Employee, Period
+from src.shards import convert_report_sharded, split_by_employees, split_by_period
+
+
+def _periods(*sizes):
+    periods = []
+    for month, size in enumerate(sizes, start=1):
+        period = Period(year=2020, month=month)
+        period.employee = [Employee(snils=number, full_name='Иванов Иван Иванович', work_experience=1)
+                           for number in range(size)]
+        periods.append(period)
+    return periods
+
+
+@pytest.mark.parametrize(
+    'sizes, max_employees, expected',
+    [
+        ((2, 2), 4, [[(1, 2), (2, 2)]]),
+        ((2, 2), 3, [[(1, 2), (2, 1)], [(2, 1)]]),
+        ((5,), 2, [[(1, 2)], [(1, 2)], [(1, 1)]]),
+        ((1, 1, 1), 2, [[(1, 1), (2, 1)], [(3, 1)]]),
+    ],
+)
+def test_split_by_employees(sizes, max_employees, expected):
+    shards = split_by_employees(_periods(*sizes), max_employees)
+    assert [[(period.month, len(period.employee)) for period in shard] for shard in shards] == expected
+
+
+def test_split_by_period():
+    assert [[period.month for period in shard] for shard in split_by_period(_periods(1, 2))] == [[1], [2]]
+
+
+@pytest.mark.parametrize('by_period, max_employees, files', [(True, 0, 3), (False, 4, 3)])
+def test_convert_report_sharded(tmp_path, by_period, max_employees, files):
+    report_file = str(tmp_path / 'report.xlsx')
+    generate_report(report_file, employees=4, periods=3)
+    output_dir = tmp_path / 'output'
+    output_dir.mkdir()
+
+    xml_files = convert_report_sharded(report_file, str(output_dir), by_period, max_employees, workers=2)
+
+    [manifest_file] = output_dir.glob('report_*.manifest.json')
+    manifest = json.loads(manifest_file.read_text(encoding='utf-8'))
+    assert manifest_file.name == f'report_{manifest["files"][0]["guid"]}.manifest.json'
+    assert len(xml_files) == len(manifest['files']) == files
+    assert [item['periods'] for item in manifest['files']] == [['2020-01'], ['2020-02'], ['2020-03']]
+    periods, _, _ = load_report(report_file)
+    snils = sorted(str(employee.snils) for employee in periods[0].employee)
+    guids = set()
+    assert [item['totals'] for item in manifest['files']] == [True] + [False] * (files - 1)
+    for xml_file, item in zip(xml_files, manifest['files']):
+        root = ElementTree.parse(xml_file).getroot()
+        assert item['snils'] == snils
+        assert sorted(node.text for node in root.findall('.//{*}СНИЛС')) == snils
+        assert root.find('.//{*}Организация') is not None
+        assert (root.find('.//{*}ФондЗП') is not None) == item['totals']
+        assert (root.find('.//{*}СЗПРук') is not None) == item['totals']
+        guids.add(item['guid'])
+    assert len(guids) == files
+
+
+def test_manifest_of_previous_run_kept(tmp_path):
+    report_file = str(tmp_path / 'report.xlsx')
+    generate_report(report_file, employees=2, periods=2)
+    for _ in range(2):
+        convert_report_sharded(report_file, str(tmp_path), by_period=True, workers=1)
+    assert len(list(tmp_path.glob('report_*.manifest.json'))) == 2
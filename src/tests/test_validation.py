@@ -0,0 +1,61 @@
+import pytest
+from openpyxl import load_workbook
+
+from benchmarks.generator import generate_report
+from src.handlers import SALARY_FUND_MIN_ROW, SALARY_MIN_ROW
+from src.validation import validate_report, write_error_report
+
+
+@pytest.fixture
+def report_with_errors(tmp_path):
+    report_file = str(tmp_path / 'report.xlsx')
+    generate_report(report_file, employees=5, periods=2)
+    wb = load_workbook(report_file)
+    salary, fund = wb['Раздел 1'], wb['Раздел 2']
+    salary[f'C{SALARY_MIN_ROW + 1}'] = 111
+    salary[f'M{SALARY_MIN_ROW + 3}'] = 2
+    salary[f'K{SALARY_MIN_ROW + 3}'] = 999
+    fund[f'B{SALARY_FUND_MIN_ROW}'] = 'ИНН'
+    wb.save(report_file)
+    return report_file
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_validate_report_collect_all_errors(report_with_errors, workers, monkeypatch):
+    monkeypatch.setattr('src.validation.CHUNK_SIZE', 3)
+    report = validate_report(report_with_errors, workers)
+    assert not report.success
+    assert report.rows == {'Раздел 1': 10, 'Раздел 2': 1, 'Раздел 3': 1}
+    assert [(error.sheet, error.row, error.column, error.field) for error in report.errors] == [
+        ('Раздел 1', SALARY_MIN_ROW + 1, 'C', 'inn'),
+        ('Раздел 1', SALARY_MIN_ROW + 3, 'K', 'staff_category_code'),
+        ('Раздел 1', SALARY_MIN_ROW + 3, 'M', 'bid'),
+        ('Раздел 2', SALARY_FUND_MIN_ROW, 'B', 'inn'),
+    ]
+    assert report.errors[0].value == 111
+
+
+def test_validate_report_without_errors(tmp_path):
+    report_file = str(tmp_path / 'report.xlsx')
+    generate_report(report_file, employees=3, periods=1)
+    report = validate_report(report_file, workers=1)
+    assert report.success
+    write_error_report(report, str(tmp_path / 'report.errors.json'))
+    assert '"error_count": 0' in (tmp_path / 'report.errors.json').read_text(encoding='utf-8')
+
+
+def test_validate_report_values_not_converted(tmp_path):
+    report_file = str(tmp_path / 'report.xlsx')
+    generate_report(report_file, employees=3, periods=1)
+    wb = load_workbook(report_file)
+    salary = wb['Раздел 1']
+    salary[f'B{SALARY_MIN_ROW}'] = 'abc'
+    salary[f'W{SALARY_MIN_ROW + 1}'] = None
+    salary[f'W{SALARY_MIN_ROW + 2}'] = 5
+    wb.save(report_file)
+    report = validate_report(report_file, workers=1)
+    assert [(error.row, error.column, error.field) for error in report.errors] == [
+        (SALARY_MIN_ROW, 'B', 'month'),
+        (SALARY_MIN_ROW + 1, 'W', 'experience_for_additional_payments'),
+        (SALARY_MIN_ROW + 2, 'W', 'experience_for_additional_payments'),
+    ]
@@ -0,0 +1,58 @@
+import asyncio
+import json
+import shutil
+from pathlib import Path
+
+from src.watch import RESULTS_FILE, DirectoryWatcher
+
+EXAMPLE_REPORT = Path(__file__).resolve().parents[2] / 'input' / 'example.xlsx'
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ready_reports_after_settle_time(tmp_path):
+    clock = Clock()
+    watcher = DirectoryWatcher(str(tmp_path), str(tmp_path), settle_time=2, clock=clock)
+    report = tmp_path / 'report.xlsx'
+    report.write_bytes(b'part')
+    assert watcher.ready_reports() == {}
+    clock.now = 1
+    report.write_bytes(b'part of file')
+    assert watcher.ready_reports() == {}
+    clock.now = 2
+    assert watcher.ready_reports() == {}
+    clock.now = 3
+    assert list(watcher.ready_reports()) == [str(report)]
+
+
+def test_watch_convert_new_report(tmp_path):
+    input_dir, output_dir = tmp_path / 'input', tmp_path / 'output'
+    input_dir.mkdir()
+    output_dir.mkdir()
+    watcher = DirectoryWatcher(str(input_dir), str(output_dir), workers=1, poll_interval=0.05, settle_time=0.2)
+
+    async def run():
+        stop = asyncio.Event()
+        task = asyncio.create_task(watcher.run(stop))
+        await asyncio.sleep(0.1)
+        shutil.copy(EXAMPLE_REPORT, input_dir / 'report.xlsx')
+        for _ in range(300):
+            if (output_dir / RESULTS_FILE).exists():
+                break
+            await asyncio.sleep(0.05)
+        stop.set()
+        await task
+
+    asyncio.run(run())
+
+    [line] = (output_dir / RESULTS_FILE).read_text(encoding='utf-8').splitlines()
+    result = json.loads(line)
+    assert result['error'] is None
+    assert Path(result['xml_file']).exists()
+    assert 'Complete generate xml file' in (output_dir / 'report.xlsx.log').read_text(encoding='utf-8')
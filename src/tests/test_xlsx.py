@@ -0,0 +1,54 @@
+from pathlib import Path
+
+import pytest
+from openpyxl import Workbook, load_workbook
+
+from src import converter
+from src.xlsx import XLSXReader, column_index, column_letter
+
+EXAMPLE_REPORT = Path(__file__).resolve().parents[2] / 'input' / 'example.xlsx'
+
+
+@pytest.mark.parametrize(
+    'test_input, expected',
+    [
+        ('A1', 1),
+        ('Z10', 26),
+        ('AI6', 35),
+    ],
+)
+def test_column_index(test_input, expected):
+    assert column_index(test_input) == expected
+
+
+@pytest.mark.parametrize('index, expected', [(1, 'A'), (26, 'Z'), (28, 'AB'), (35, 'AI'), (703, 'AAA')])
+def test_column_letter(index, expected):
+    assert column_letter(index) == expected
+
+
+@pytest.mark.parametrize('sheet_name, min_row', [('Раздел 1', 6), ('Раздел 2', 5), ('Раздел 3', 4), ('Раздел 1', 1)])
+def test_reader_equal_openpyxl(sheet_name, min_row):
+    reader = XLSXReader(str(EXAMPLE_REPORT))
+    wb = load_workbook(filename=EXAMPLE_REPORT, read_only=True)
+    expected = list(wb[sheet_name].iter_rows(min_row=min_row, values_only=True))
+    assert list(reader[sheet_name].iter_rows(min_row=min_row, values_only=True)) == expected
+    reader.close()
+    wb.close()
+
+
+def test_load_report_with_xml_reader(monkeypatch):
+    expected = converter.load_report(str(EXAMPLE_REPORT))
+    monkeypatch.setattr(converter.settings, 'reader', 'xml')
+    assert converter.load_report(str(EXAMPLE_REPORT)) == expected
+
+
+def test_formula_without_calculated_value(tmp_path):
+    filename = str(tmp_path / 'formula.xlsx')
+    wb = Workbook()
+    wb.active.title = 'Раздел 1'
+    # openpyxl writes formula with empty `<v/>`
+    wb.active.append([1, '=A1+1', 1.5, '=C1*2'])
+    wb.save(filename)
+    reader = XLSXReader(filename)
+    assert list(reader['Раздел 1'].iter_rows(values_only=True)) == [(1, None, 1.5, None)]
+    reader.close()
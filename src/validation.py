@@ -0,0 +1,153 @@
+import json
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Deque, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from loguru import logger
+from pydantic import ValidationError
+
+from src.converter import open_workbook
+from src.handlers import (
+    EXECUTIVE_SALARY_MIN_ROW,
+    SALARY_FUND_MIN_ROW,
+    SALARY_MIN_ROW,
+    iter_sheet_values,
+)
+from src.models import ExecutiveSalary, SalaryFund
+from src.records import validate_salary
+from src.xlsx import column_letter
+
+ERRORS_SUFFIX = '.errors.json'
+# rows validated by worker process at once
+CHUNK_SIZE = 2000
+
+# sheet name -> (first row with data, model, validate)
+SHEETS = {
+    'Раздел 1': (SALARY_MIN_ROW, validate_salary.model, validate_salary),
+    'Раздел 2': (SALARY_FUND_MIN_ROW, SalaryFund, None),
+    'Раздел 3': (EXECUTIVE_SALARY_MIN_ROW, ExecutiveSalary, None),
+}
+
+
+class CellError(NamedTuple):
+    sheet: str
+    row: int
+    column: Optional[str]
+    field: str
+    value: Any
+    message: str
+    type: str
+
+
+def _validate_row(model, validate, values: Dict[str, Any]) -> None:
+    if validate:
+        validate(values)
+    else:
+        model(**values)
+
+
+def validate_rows(sheet: str, first_row: int, rows: List[Tuple]) -> List[CellError]:
+    """All errors of rows, `first_row` - number of first row in sheet, error of row not stop validation"""
+    _, model, validate = SHEETS[sheet]
+    fields = list(model.__fields__)
+    errors = []
+    for row_number, row in enumerate(rows, start=first_row):
+        values = dict(zip(fields, row))
+        try:
+            _validate_row(model, validate, values)
+        except ValidationError as e:
+            for error in e.errors():
+                field = str(error['loc'][0])
+                column = column_letter(fields.index(field) + 1) if field in fields else None
+                errors.append(CellError(
+                    sheet, row_number, column, field, values.get(field), error['msg'], error['type']))
+        except Exception as e:
+            # not validation error of field, row reported without column
+            errors.append(CellError(sheet, row_number, None, '', None, str(e), type(e).__name__))
+    return errors
+
+
+Chunk = Tuple[str, int, List[Tuple]]
+
+
+def _iter_chunks(wb, rows: Dict[str, int]) -> Iterator[Chunk]:
+    """(sheet name, number of first row, rows) of all sheets, `rows` - counter of rows by sheet"""
+    for sheet, (min_row, _, _) in SHEETS.items():
+        values = iter_sheet_values(wb[sheet], min_row)
+        first_row = min_row
+        while True:
+            chunk = list(islice(values, CHUNK_SIZE))
+            if not chunk:
+                break
+            rows[sheet] = rows.get(sheet, 0) + len(chunk)
+            yield sheet, first_row, chunk
+            first_row += len(chunk)
+
+
+class ValidationReport(NamedTuple):
+    report: str
+    rows: Dict[str, int]
+    errors: List[CellError]
+
+    @property
+    def success(self) -> bool:
+        return not self.errors
+
+    def dict(self) -> Dict[str, Any]:
+        return {
+            'report': self.report,
+            'rows': self.rows,
+            'error_count': len(self.errors),
+            'errors': [error._asdict() for error in self.errors],
+        }
+
+
+def _validate_parallel(chunks: Iterator[Chunk], workers: int) -> Iterator[List[CellError]]:
+    """Errors of chunks in order, number of chunks waiting for validation limited"""
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending: Deque[Future] = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(validate_rows, *chunk))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def validate_report(report_file: str, workers: Optional[int] = None) -> ValidationReport:
+    """
+    Validate every row of all sheets without stopping on errors, xml not created.
+    Rows read in one pass and validated by chunks in parallel processes.
+    :param workers: int - number of processes, by default number of processors, 1 - in current process
+    """
+    logger.info(f'Validate file: {report_file}')
+    workers = workers or os.cpu_count() or 1
+    rows: Dict[str, int] = {}
+    errors: List[CellError] = []
+    wb = open_workbook(report_file)
+    try:
+        chunks = _iter_chunks(wb, rows)
+        if workers == 1:
+            results = (validate_rows(*chunk) for chunk in chunks)
+        else:
+            results = _validate_parallel(chunks, workers)
+        for result in results:
+            errors.extend(result)
+    finally:
+        wb.close()
+    for error in errors:
+        cell = f'{error.column or ""}{error.row}'
+        logger.error(f'Error in sheet "{error.sheet}" cell {cell}: {error.field} - {error.message}')
+    logger.info(f'Validated rows: {sum(rows.values())}, errors: {len(errors)}')
+    return ValidationReport(report_file, rows, errors)
+
+
+def create_error_report_name(report_file: str) -> str:
+    return f'{os.path.splitext(os.path.basename(report_file))[0]}{ERRORS_SUFFIX}'
+
+
+def write_error_report(report: ValidationReport, filename: str) -> None:
+    with open(filename, mode='w', encoding='utf-8') as result:
+        json.dump(report.dict(), result, ensure_ascii=False, indent=4, default=str)
@@ -0,0 +1,150 @@
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, Optional, Set, Tuple
+
+from loguru import logger
+
+from src.batch import BatchResult, convert_file, find_reports
+from src.cache import SheetCache
+
+RESULTS_FILE = 'watch.results.jsonl'
+LOG_SUFFIX = '.log'
+
+# size and modification time of file
+Signature = Tuple[int, int]
+
+
+def convert_with_log(report_file: str, output_dir: str, log_file: str,
+                     cache: Optional[SheetCache] = None) -> BatchResult:
+    """Convert workbook in worker process, messages of conversion also written to log of file"""
+    sink = logger.add(log_file, mode='w', encoding='utf-8')
+    try:
+        return convert_file(report_file, output_dir, cache)
+    finally:
+        logger.remove(sink)
+
+
+def _signature(filename: str) -> Optional[Signature]:
+    try:
+        stat = os.stat(filename)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _append_line(filename: str, line: str) -> None:
+    with open(filename, mode='a', encoding='utf-8') as result:
+        result.write(line + '\n')
+
+
+class DirectoryWatcher:
+    """
+    Watch input folder and convert new or changed workbooks.
+    Workbook converted when its size and modification time not changed for `settle_time` seconds,
+    so files still copied or saved are skipped. Conversions run in warm worker processes,
+    at most `workers` at the same time. Result of each conversion appended to `RESULTS_FILE`
+    and messages written to `<workbook>.log` in output folder.
+    """
+
+    def __init__(
+            self,
+            input_dir: str,
+            output_dir: str,
+            workers: Optional[int] = None,
+            cache: Optional[SheetCache] = None,
+            poll_interval: float = 1.0,
+            settle_time: float = 2.0,
+            clock: Callable[[], float] = time.monotonic,
+    ):
+        self.input_dir = input_dir
+        self.output_dir = output_dir
+        self.workers = workers or os.cpu_count() or 1
+        self.cache = cache
+        self.poll_interval = poll_interval
+        self.settle_time = settle_time
+        self.clock = clock
+        # last seen signature and time since it not changed
+        self._seen: Dict[str, Tuple[Signature, float]] = {}
+        # signature of converted or scheduled file
+        self._done: Dict[str, Signature] = {}
+        # converted now or waiting for worker
+        self._scheduled: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def ready_reports(self) -> Dict[str, Signature]:
+        """Workbooks not changed for `settle_time` and not converted in this state"""
+        now = self.clock()
+        ready = {}
+        reports = find_reports(self.input_dir)
+        for report in reports:
+            signature = _signature(report)
+            if signature is None:
+                continue
+            seen = self._seen.get(report)
+            if seen is None or seen[0] != signature:
+                self._seen[report] = (signature, now)
+                continue
+            if now - seen[1] >= self.settle_time and self._done.get(report) != signature \
+                    and report not in self._scheduled:
+                ready[report] = signature
+        for report in set(self._seen) - set(reports):
+            del self._seen[report]
+        return ready
+
+    async def _convert(self, report: str) -> BatchResult:
+        loop = asyncio.get_running_loop()
+        log_file = os.path.join(self.output_dir, os.path.basename(report) + LOG_SUFFIX)
+        try:
+            async with self._semaphore:
+                result = await loop.run_in_executor(
+                    self._executor, convert_with_log, report, self.output_dir, log_file, self.cache)
+        finally:
+            self._scheduled.discard(report)
+        line = json.dumps({
+            'time': datetime.now().isoformat(),
+            **result._replace(profile=None)._asdict(),
+            'log': log_file,
+        }, ensure_ascii=False)
+        # default thread pool of loop, asyncio.to_thread is not available on Python 3.8
+        await loop.run_in_executor(None, _append_line, os.path.join(self.output_dir, RESULTS_FILE), line)
+        if result.success:
+            logger.info(f'Converted {os.path.basename(report)} -> {os.path.basename(result.xml_file)}')
+        else:
+            logger.error(f'Error convert {os.path.basename(report)}: {result.error}')
+        return result
+
+    async def poll(self) -> None:
+        """Check input folder once and schedule ready workbooks"""
+        ready = await asyncio.get_running_loop().run_in_executor(None, self.ready_reports)
+        for report, signature in ready.items():
+            self._done[report] = signature
+            self._scheduled.add(report)
+            logger.info(f'New report: {report}')
+            task = asyncio.create_task(self._convert(report))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def run(self, stop: Optional[asyncio.Event] = None) -> None:
+        """Watch until `stop` is set, running conversions completed before return"""
+        stop = stop or asyncio.Event()
+        self._semaphore = asyncio.Semaphore(self.workers)
+        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        logger.info(f'Watch folder: {self.input_dir}')
+        try:
+            while not stop.is_set():
+                await self.poll()
+                try:
+                    await asyncio.wait_for(stop.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+            if self._tasks:
+                await asyncio.gather(*self._tasks)
+        finally:
+            self._executor.shutdown(wait=True)
+            logger.info('Watch stopped')
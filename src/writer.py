@@ -0,0 +1,80 @@
+from contextlib import contextmanager
+from typing import BinaryIO, Dict, List, Optional
+from xml.sax.saxutils import escape
+
+XML_DECLARATION = "<?xml version='1.0' encoding='utf-8'?>"
+INDENT = '    '
+ATTRIBUTE_ENTITIES = {'"': '&quot;'}
+
+
+class XMLStreamWriter:
+    """
+    Incremental xml writer. Elements written to the stream as soon as they created,
+    so memory not depend on report size.
+    With `indent` write pretty xml, each attribute of root node on new line (as in output/example.xml),
+    without `indent` write compact xml.
+    """
+
+    def __init__(self, stream: BinaryIO, indent: Optional[str] = INDENT, encoding: str = 'utf-8'):
+        self.stream = stream
+        self.indent = indent
+        self.encoding = encoding
+        self._stack: List[str] = []
+        self._started = False
+
+    def _write(self, text: str) -> None:
+        self.stream.write(text.encode(self.encoding))
+
+    def _new_line(self) -> str:
+        if not self._started:
+            self._started = True
+            return ''
+        if self.indent is None:
+            return ''
+        return '\n' + self.indent * len(self._stack)
+
+    def _attributes(self, attributes: Optional[Dict[str, str]]) -> str:
+        if not attributes:
+            return ''
+        items = [f'{key}="{escape(value, ATTRIBUTE_ENTITIES)}"' for key, value in attributes.items()]
+        if self.indent is None:
+            return ' ' + ' '.join(items)
+        separator = '\n' + self.indent * (len(self._stack) + 1)
+        return separator + separator.join(items)
+
+    def start_document(self) -> None:
+        self._write(XML_DECLARATION + '\n')
+
+    def start(self, tag: str, attributes: Optional[Dict[str, str]] = None) -> None:
+        self._write(f'{self._new_line()}<{tag}{self._attributes(attributes)}>')
+        self._stack.append(tag)
+
+    def end(self) -> None:
+        tag = self._stack.pop()
+        self._write(f'{self._new_line()}</{tag}>')
+
+    def element(self, tag: str, text: Optional[str]) -> None:
+        line = self._new_line()
+        if text:
+            self._write(f'{line}<{tag}>{escape(text)}</{tag}>')
+        else:
+            self._write(f'{line}<{tag}/>')
+
+    def elements(self, items) -> None:
+        """Write pairs (tag, text) as elements"""
+        for tag, text in items:
+            self.element(tag, text)
+
+    def write_raw(self, data: bytes) -> None:
+        """
+        Write serialized element, e.g. copied from other document.
+        Element must be serialized with the same indent for the current depth.
+        """
+        self._write(self._new_line())
+        self.stream.write(data)
+
+    @contextmanager
+    def node(self, tag: str, attributes: Optional[Dict[str, str]] = None):
+        self.start(tag, attributes)
+        yield self
+        self.end()
@@ -0,0 +1,169 @@
+import posixpath
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+from xml.etree import ElementTree
+from zipfile import ZipFile
+
+MAIN_NAMESPACE = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+RELATIONSHIP_ID = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id'
+RELATIONSHIP_NAMESPACE = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+WORKBOOK_PART = 'xl/workbook.xml'
+WORKBOOK_RELATIONSHIPS_PART = 'xl/_rels/workbook.xml.rels'
+SHARED_STRINGS_PART = 'xl/sharedStrings.xml'
+
+
+def sheet_parts(archive: ZipFile) -> Dict[str, str]:
+    """Sheet name -> path of sheet xml in xlsx archive"""
+    relationships = ElementTree.fromstring(archive.read(WORKBOOK_RELATIONSHIPS_PART))
+    targets = {
+        relationship.get('Id'): relationship.get('Target')
+        for relationship in relationships.iter(f'{RELATIONSHIP_NAMESPACE}Relationship')
+    }
+    workbook = ElementTree.fromstring(archive.read(WORKBOOK_PART))
+    result = {}
+    for sheet in workbook.iter(f'{MAIN_NAMESPACE}sheet'):
+        target = targets[sheet.get(RELATIONSHIP_ID)]
+        if target.startswith('/'):
+            result[sheet.get('name')] = target.lstrip('/')
+        else:
+            result[sheet.get('name')] = posixpath.normpath(posixpath.join(posixpath.dirname(WORKBOOK_PART), target))
+    return result
+
+
+def column_index(reference: str) -> int:
+    """Column number (1-based) from cell reference, `AB12` -> 28"""
+    result = 0
+    for char in reference:
+        if not char.isalpha():
+            break
+        result = result * 26 + ord(char.upper()) - 64
+    return result
+
+
+def column_letter(index: int) -> str:
+    """Column letter from number (1-based), 28 -> `AB`"""
+    letters = ''
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def _cast_number(value: str):
+    if '.' in value or 'E' in value or 'e' in value:
+        return float(value)
+    return int(value)
+
+
+def _text(node) -> str:
+    """Text of string item, rich text runs joined, phonetic runs skipped"""
+    parts = []
+    for child in node:
+        if child.tag == f'{MAIN_NAMESPACE}t':
+            parts.append(child.text or '')
+        elif child.tag == f'{MAIN_NAMESPACE}r':
+            parts.extend(text.text or '' for text in child.iter(f'{MAIN_NAMESPACE}t'))
+    return ''.join(parts)
+
+
+class SheetReader:
+    """
+    Sheet of xlsx file read directly from archive with iterparse.
+    Same interface as openpyxl read-only worksheet for loaders: `title` and `iter_rows`.
+    Difference from openpyxl: for formulas return last calculated value,
+    numbers with date format not converted to dates.
+    """
+
+    def __init__(self, workbook: 'XLSXReader', title: str, part: str):
+        self.parent = workbook
+        self.title = title
+        self.part = part
+
+    def _cell_value(self, cell):
+        data_type = cell.get('t', 'n')
+        if data_type == 'inlineStr':
+            node = cell.find(f'{MAIN_NAMESPACE}is')
+            return None if node is None else _text(node)
+        value = cell.findtext(f'{MAIN_NAMESPACE}v')
+        if not value:
+            # no value or empty `<v/>` of formula never calculated
+            return None
+        if data_type == 'n':
+            return _cast_number(value)
+        if data_type == 's':
+            return self.parent.shared_strings[int(value)]
+        if data_type == 'b':
+            return bool(int(value))
+        if data_type == 'd':
+            return datetime.fromisoformat(value)
+        return value
+
+    def _row_values(self, row, width: Optional[int]) -> Tuple:
+        cells = {}
+        column = 0
+        for cell in row.iter(f'{MAIN_NAMESPACE}c'):
+            reference = cell.get('r')
+            column = column_index(reference) if reference else column + 1
+            cells[column] = self._cell_value(cell)
+        width = width or max(cells, default=0)
+        return tuple(cells.get(column) for column in range(1, width + 1))
+
+    def iter_rows(self, min_row: int = 1, values_only: bool = True) -> Iterator[Tuple]:
+        if not values_only:
+            raise ValueError('Only values supported')
+        width = None
+        counter = min_row
+        index = 0
+        sheet_data = None
+        with self.parent.archive.open(self.part) as source:
+            for event, element in ElementTree.iterparse(source, events=('start', 'end')):
+                if event == 'start':
+                    if element.tag == f'{MAIN_NAMESPACE}sheetData':
+                        sheet_data = element
+                    continue
+                if element.tag == f'{MAIN_NAMESPACE}dimension':
+                    reference = element.get('ref', '').split(':')[-1]
+                    width = column_index(reference) or None
+                elif element.tag == f'{MAIN_NAMESPACE}row':
+                    index = int(element.get('r', index + 1))
+                    if index >= counter:
+                        # missing rows
+                        for _ in range(counter, index):
+                            yield (None,) * (width or 0)
+                        yield self._row_values(element, width)
+                        counter = index + 1
+                    sheet_data.clear()
+
+
+class XLSXReader:
+    """
+    Fast reader of xlsx file without openpyxl, values of sheets as tuples.
+    Same interface as openpyxl read-only workbook for loaders: `wb[name]` and `close`.
+    """
+
+    def __init__(self, filename: str):
+        self.archive = ZipFile(filename)
+        self._parts = sheet_parts(self.archive)
+        self._shared_strings: Optional[List[str]] = None
+
+    @property
+    def sheetnames(self) -> List[str]:
+        return list(self._parts)
+
+    @property
+    def shared_strings(self) -> List[str]:
+        if self._shared_strings is None:
+            self._shared_strings = []
+            if SHARED_STRINGS_PART in self.archive.namelist():
+                with self.archive.open(SHARED_STRINGS_PART) as source:
+                    for _, element in ElementTree.iterparse(source):
+                        if element.tag == f'{MAIN_NAMESPACE}si':
+                            self._shared_strings.append(_text(element))
+                            element.clear()
+        return self._shared_strings
+
+    def __getitem__(self, name: str) -> SheetReader:
+        return SheetReader(self, name, self._parts[name])
+
+    def close(self) -> None:
+        self.archive.close()